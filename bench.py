@@ -0,0 +1,142 @@
+"""Benchmark every engine for days 5-8 on synthetic inputs of growing size.
+
+    python bench.py --day 8 --repeat 5 --output bench.json
+
+Every engine in the solver registry is timed. Results are written as JSON:
+one record per (day, part, engine, size) with the best and mean wall time,
+the best parse and solve times, the answer and any error. Engines for the
+same part and size must agree; disagreements are flagged in the output.
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import sys
+import typing as t
+
+from utils import synthetic
+from utils.solvers import Solver, discover, solvers_for, time_solver
+
+Generator = t.Callable[[random.Random, int], t.Tuple[str, ...]]
+
+
+def _fleet(rng: random.Random, flights: int) -> t.Tuple[str, ...]:
+    return tuple("\n".join(passes) for passes in synthetic.fleet(rng, flights))
+
+
+def _customs(rng: random.Random, groups: int) -> str:
+    return synthetic.customs_groups(rng, groups, distinct=1000)
+
+
+def _single(generate: t.Callable[[random.Random, int], str]) -> Generator:
+    return lambda rng, size: (generate(rng, size),)
+
+
+# day -> (inputs generator(rng, size), default sizes)
+PUZZLES: t.Dict[int, t.Tuple[Generator, t.Tuple[int, ...]]] = {
+    5: (_fleet, (1, 10, 100)),
+    6: (_single(_customs), (100, 1000, 10000)),
+    7: (_single(synthetic.bag_rules), (50, 200, 600)),
+    8: (_single(synthetic.boot_program), (100, 400, 800)),
+}
+
+
+def time_engine(
+    solver: Solver, inputs: t.Sequence[str], repeat: int
+) -> t.Dict[str, t.Any]:
+    """Solve every input `repeat` times, swallowing the solver's stdout."""
+    totals, parses, solves = [], [], []
+    answers = None
+    error = None
+    for _ in range(repeat):
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = [time_solver(solver, data) for data in inputs]
+        except Exception as e:  # pylint: disable=broad-except
+            error = f"{type(e).__name__}: {e}"
+            break
+        answers = [x.answer for x in timings]
+        parses.append(sum(x.parse_seconds for x in timings))
+        solves.append(sum(x.solve_seconds for x in timings))
+        totals.append(parses[-1] + solves[-1])
+
+    return {
+        "best": min(totals) if totals else None,
+        "mean": statistics.mean(totals) if totals else None,
+        "parse_best": min(parses) if parses else None,
+        "solve_best": min(solves) if solves else None,
+        "runs": len(totals),
+        "answer": answers,
+        "error": error,
+    }
+
+
+def run_puzzle(
+    day: int,
+    sizes: t.Optional[t.Sequence[int]] = None,
+    engines: t.Optional[t.Sequence[str]] = None,
+    repeat: int = 3,
+    seed: int = 0,
+) -> t.List[t.Dict[str, t.Any]]:
+    generate, default_sizes = PUZZLES[day]
+    solvers = [
+        s for s in solvers_for(day) if not engines or s.engine in engines
+    ]
+    results = []
+    for size in sizes or default_sizes:
+        inputs = generate(random.Random(seed), size)
+        for part in sorted({s.part for s in solvers}):
+            answers = set()
+            part_results = []
+            for solver in (s for s in solvers if s.part == part):
+                record = {
+                    "day": day,
+                    "part": part,
+                    "engine": solver.engine,
+                    "size": size,
+                    "seed": seed,
+                }
+                record.update(time_engine(solver, inputs, repeat))
+                if record["error"] is None:
+                    answers.add(json.dumps(record["answer"]))
+                part_results.append(record)
+
+            for record in part_results:
+                record["agrees"] = len(answers) <= 1
+            results.extend(part_results)
+    return results
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--day", type=int, choices=sorted(PUZZLES), action="append"
+    )
+    parser.add_argument("--engine", action="append")
+    parser.add_argument("--size", type=int, action="append")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    discover()
+    results = []
+    for day in args.day or sorted(PUZZLES):
+        results.extend(
+            run_puzzle(day, args.size, args.engine, args.repeat, args.seed)
+        )
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    return 0 if all(r["agrees"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
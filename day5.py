@@ -2,6 +2,10 @@ import typing as t
 from enum import Enum
 import re
 
+from utils.instrument import instrument
+from utils.parse import get_lines
+from utils.solvers import register
+
 
 ROWS = 128
 COLS = 8
@@ -103,6 +107,7 @@ def get_seat_id(seat_hash: str) -> int:
     return id_from_coords(row, col)
 
 
+@instrument()
 def calculate_occupied_ids(seat_hashes: t.Tuple[str, ...]) -> t.Tuple[int, ...]:
     """Figure out which seats in the plane have boarding passes."""
     return tuple(map(get_seat_id, seat_hashes))
@@ -124,6 +129,7 @@ def get_unoccupied_seats(seat_hashes: t.Tuple[str, ...]) -> t.Tuple[str, ...]:
     return tuple(set(all_ids) - set(occupied_ids))
 
 
+@register(day=5, part=2, parse=get_lines, default_input="data/day5.txt")
 def find_my_seat(seat_hashes: t.Tuple[str, ...]) -> int:
     """Given all seat hashes _but_ my own, determine my seat ID.
 
@@ -142,6 +148,52 @@ def find_my_seat(seat_hashes: t.Tuple[str, ...]) -> int:
     return remaining[0]
 
 
+# ***** Batched decoding *****
+# A pass is just a 10 bit binary number: F/L are 0s and B/R are 1s.
+
+SEAT_BITS = str.maketrans("FBLR", "0101")
+# The same shape `parse_picks` expects; `int(..., 2)` alone would also take
+# digits, whitespace and underscores.
+SEAT_HASH = re.compile(r"[FB]{7}[LR]{3}")
+
+
+def decode_seat_id(seat_hash: str) -> int:
+    """'FBFBBFFRLR' -> 357, without building ranges."""
+    if not SEAT_HASH.fullmatch(seat_hash):
+        raise ValueError(f"invalid seat hash {seat_hash!r}")
+    return int(seat_hash.translate(SEAT_BITS), 2)
+
+
+def decode_seat_ids(seat_hashes: t.Iterable[str]) -> t.Tuple[int, ...]:
+    return tuple(map(decode_seat_id, seat_hashes))
+
+
+def parse_seat_ids(data: str) -> t.Tuple[int, ...]:
+    return decode_seat_ids(get_lines(data))
+
+
+def find_gap(occupied_ids: t.Collection[int]) -> t.Optional[int]:
+    """The first unclaimed ID whose neighbours are both claimed, if any."""
+    occupied = set(occupied_ids)
+    for seat in range(1, ROWS * COLS - 1):
+        if (
+            seat not in occupied
+            and seat - 1 in occupied
+            and seat + 1 in occupied
+        ):
+            return seat
+    return None
+
+
+@register(day=5, part=2, parse=parse_seat_ids, engine="decoded")
+def find_my_seat_id(occupied_ids: t.Tuple[int, ...]) -> int:
+    """`find_my_seat` over already decoded IDs."""
+    seat = find_gap(occupied_ids)
+    if seat is None:
+        raise ValueError("no unclaimed seat with claimed neighbours")
+    return seat
+
+
 SEAT_DATA = [
     'FBBBFBBLRR',
     'BFFFBBFLRR',
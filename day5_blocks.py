@@ -0,0 +1,112 @@
+"""Index of free seat runs per row, for seating groups together.
+
+Rows are kept as bitmasks of claimed columns. A segment tree over the rows
+holds the longest free run in each subtree, so "first row with k adjacent free
+seats" walks one root-to-leaf path and claiming a seat updates one, both in
+O(log ROWS). Coordinates are the same (row, col) as `day5.get_seat_coords`,
+and seat IDs the same as `day5.id_from_coords`.
+"""
+import typing as t
+
+from day5 import COLS, ROWS, decode_seat_id, id_from_coords
+
+
+def _longest_free_run(mask: int, cols: int) -> int:
+    longest = run = 0
+    for col in range(cols):
+        run = 0 if mask >> col & 1 else run + 1
+        longest = max(longest, run)
+    return longest
+
+
+def _first_free_run(mask: int, cols: int, size: int) -> t.Optional[int]:
+    run = 0
+    for col in range(cols):
+        run = 0 if mask >> col & 1 else run + 1
+        if run == size:
+            return col - size + 1
+    return None
+
+
+class SeatBlockIndex:
+    def __init__(self, rows: int = ROWS, cols: int = COLS):
+        self.rows = rows
+        self.cols = cols
+        self.row_masks = [0] * rows
+        # longest free run for every possible row mask
+        self._runs = tuple(_longest_free_run(m, cols) for m in range(1 << cols))
+
+        self._leaves = 1
+        while self._leaves < rows:
+            self._leaves *= 2
+        self._tree = [0] * (2 * self._leaves)
+        for row in range(rows):
+            self._tree[self._leaves + row] = cols
+        for node in range(self._leaves - 1, 0, -1):
+            self._tree[node] = max(
+                self._tree[2 * node], self._tree[2 * node + 1]
+            )
+
+    @classmethod
+    def from_passes(cls, seat_hashes: t.Iterable[str]) -> "SeatBlockIndex":
+        index = cls()
+        for seat_hash in seat_hashes:
+            index.claim_pass(seat_hash)
+        return index
+
+    def _update(self, row: int, mask: int):
+        self.row_masks[row] = mask
+        node = self._leaves + row
+        self._tree[node] = self._runs[mask]
+        node //= 2
+        while node:
+            best = max(self._tree[2 * node], self._tree[2 * node + 1])
+            if self._tree[node] == best:
+                break
+            self._tree[node] = best
+            node //= 2
+
+    def claim(self, row: int, col: int):
+        self._update(row, self.row_masks[row] | 1 << col)
+
+    def release(self, row: int, col: int):
+        self._update(row, self.row_masks[row] & ~(1 << col))
+
+    def claim_id(self, seat_id: int):
+        self.claim(*divmod(seat_id, self.cols))
+
+    def claim_pass(self, seat_hash: str):
+        self.claim_id(decode_seat_id(seat_hash))
+
+    def is_claimed(self, row: int, col: int) -> bool:
+        return bool(self.row_masks[row] >> col & 1)
+
+    def longest_free_run(self) -> int:
+        return self._tree[1]
+
+    def first_row_with_block(self, size: int) -> t.Optional[int]:
+        """Lowest row with at least `size` adjacent free seats."""
+        if size <= 0 or self._tree[1] < size:
+            return None
+        node = 1
+        while node < self._leaves:
+            node = 2 * node if self._tree[2 * node] >= size else 2 * node + 1
+        return node - self._leaves
+
+    def find_block(self, size: int) -> t.Optional[t.Tuple[int, int]]:
+        """(row, first col) of the first run of `size` free seats."""
+        row = self.first_row_with_block(size)
+        if row is None:
+            return None
+        return (row, _first_free_run(self.row_masks[row], self.cols, size))
+
+    def allocate(self, size: int) -> t.Optional[t.Tuple[int, ...]]:
+        """Claim the first run of `size` free adjacent seats; their IDs."""
+        found = self.find_block(size)
+        if found is None:
+            return None
+        row, start = found
+        self._update(row, self.row_masks[row] | ((1 << size) - 1) << start)
+        return tuple(
+            id_from_coords(row, col) for col in range(start, start + size)
+        )
@@ -0,0 +1,212 @@
+"""Seat occupancy for many flights at once.
+
+Each flight is a compact bitmap (one bit per seat ID, packed into a
+bytearray). Flights are spread over shards by hash, and each shard has its own
+lock, so threads recording passes for different flights rarely contend.
+"""
+import random
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from day5 import COLS, ROWS, decode_seat_id
+from utils.synthetic import seat_hash
+
+SEATS = ROWS * COLS
+
+# Free seats in a byte of the bitmap, for fast counts.
+_FREE_BITS = bytes(8 - bin(b).count("1") for b in range(256))
+
+
+class FlightBitmap:
+    """Claimed seats of one flight; bit `id % 8` of byte `id // 8`.
+
+    The padding bits after the last seat start out set, so they never count
+    as free.
+    """
+
+    __slots__ = ("bits", "seats")
+
+    def __init__(self, seats: int = SEATS):
+        self.seats = seats
+        self.bits = bytearray((seats + 7) // 8)
+        if seats % 8:
+            self.bits[-1] = 0xFF << seats % 8 & 0xFF
+
+    def _check(self, seat_id: int):
+        if not 0 <= seat_id < self.seats:
+            raise ValueError(f"seat {seat_id} is outside the plane")
+
+    def claim(self, seat_id: int) -> bool:
+        """Mark a seat claimed; return whether it was free."""
+        self._check(seat_id)
+        byte, bit = divmod(seat_id, 8)
+        mask = 1 << bit
+        if self.bits[byte] & mask:
+            return False
+        self.bits[byte] |= mask
+        return True
+
+    def is_claimed(self, seat_id: int) -> bool:
+        self._check(seat_id)
+        byte, bit = divmod(seat_id, 8)
+        return bool(self.bits[byte] >> bit & 1)
+
+    def free_count(self) -> int:
+        return sum(self.bits.translate(_FREE_BITS))
+
+    def first_free_block(self, size: int) -> t.Optional[int]:
+        """The lowest seat ID starting `size` consecutive free seats."""
+        run = 0
+        for byte_index, byte in enumerate(self.bits):
+            if byte == 0xFF:
+                run = 0
+                continue
+            if byte == 0 and run + 8 < size:
+                run += 8
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    run = 0
+                    continue
+                run += 1
+                if run == size:
+                    return byte_index * 8 + bit - size + 1
+        return None
+
+    @classmethod
+    def from_bits(cls, bits: bytes, seats: int = SEATS) -> "FlightBitmap":
+        """Wrap bits copied from another bitmap of `seats` seats."""
+        if len(bits) != (seats + 7) // 8:
+            raise ValueError(f"{len(bits)} bytes can't hold {seats} seats")
+        bitmap = cls(0)
+        bitmap.seats = seats
+        bitmap.bits = bytearray(bits)
+        return bitmap
+
+
+class _Shard:
+    __slots__ = ("lock", "flights")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights: t.Dict[t.Hashable, FlightBitmap] = {}
+
+
+class FleetOccupancy:
+    """Flight-keyed occupancy store, safe to update from many threads."""
+
+    def __init__(self, shards: int = 64, seats: int = SEATS):
+        self.seats = seats
+        self._shards = tuple(_Shard() for _ in range(shards))
+
+    def _shard(self, flight: t.Hashable) -> _Shard:
+        return self._shards[hash(flight) % len(self._shards)]
+
+    def record(self, flight: t.Hashable, seat_hash: str) -> int:
+        """Decode a pass and claim its seat on `flight`; return the seat ID."""
+        seat_id = decode_seat_id(seat_hash)
+        self.claim(flight, seat_id)
+        return seat_id
+
+    def claim(self, flight: t.Hashable, seat_id: int) -> bool:
+        shard = self._shard(flight)
+        with shard.lock:
+            bitmap = shard.flights.get(flight)
+            if bitmap is None:
+                bitmap = shard.flights[flight] = FlightBitmap(self.seats)
+            return bitmap.claim(seat_id)
+
+    def record_many(self, flight: t.Hashable, seat_hashes: t.Iterable[str]):
+        """Decode outside the lock, then claim the whole batch under it once."""
+        seat_ids = tuple(map(decode_seat_id, seat_hashes))
+        shard = self._shard(flight)
+        with shard.lock:
+            bitmap = shard.flights.get(flight)
+            if bitmap is None:
+                bitmap = shard.flights[flight] = FlightBitmap(self.seats)
+            for seat_id in seat_ids:
+                bitmap.claim(seat_id)
+
+    def _snapshot(self) -> t.Iterator[t.Tuple[t.Hashable, bytes]]:
+        """Copy each shard's bitmaps under its lock, one shard at a time."""
+        for shard in self._shards:
+            with shard.lock:
+                copied = [(f, bytes(b.bits)) for f, b in shard.flights.items()]
+            yield from copied
+
+    def flights(self) -> int:
+        return sum(len(shard.flights) for shard in self._shards)
+
+    def free_seats(self, flight: t.Hashable) -> int:
+        shard = self._shard(flight)
+        with shard.lock:
+            bitmap = shard.flights.get(flight)
+            return self.seats if bitmap is None else bitmap.free_count()
+
+    def free_counts(self) -> t.Dict[t.Hashable, int]:
+        """Free seats on every known flight."""
+        return {
+            flight: sum(bits.translate(_FREE_BITS))
+            for flight, bits in self._snapshot()
+        }
+
+    def total_free(self) -> int:
+        return sum(self.free_counts().values())
+
+    def first_free_blocks(self, size: int) -> t.Dict[t.Hashable, int]:
+        """First seat of a free block of `size`, for flights that have one."""
+        found = {}
+        for flight, bits in self._snapshot():
+            bitmap = FlightBitmap.from_bits(bits, self.seats)
+            start = bitmap.first_free_block(size)
+            if start is not None:
+                found[flight] = start
+        return found
+
+
+def contention_benchmark(
+    flights: int = 1000,
+    passes: int = 200_000,
+    threads: int = 8,
+    shards: t.Sequence[int] = (1, 8, 64),
+    seed: int = 0,
+) -> t.List[t.Dict[str, t.Any]]:
+    """Time `threads` workers recording random passes for each shard count."""
+    rng = random.Random(seed)
+    work = [
+        (rng.randrange(flights), seat_hash(rng.randrange(SEATS)))
+        for _ in range(passes)
+    ]
+    chunks = [work[i::threads] for i in range(threads)]
+
+    results = []
+    for shard_count in shards:
+        store = FleetOccupancy(shard_count)
+
+        def _worker(chunk, store=store):
+            for flight, seat in chunk:
+                store.record(flight, seat)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(_worker, chunks))
+        elapsed = time.perf_counter() - started
+        results.append(
+            {
+                "shards": shard_count,
+                "threads": threads,
+                "passes": passes,
+                "seconds": elapsed,
+                "passes_per_second": passes / elapsed,
+                "flights": store.flights(),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(contention_benchmark(), indent=2))
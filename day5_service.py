@@ -0,0 +1,259 @@
+"""A local asyncio service that decodes streamed boarding passes.
+
+Line protocol, one request per line, one response line per request, in order:
+
+    FBFBBFFRLR  -> 357            (the pass is decoded and its seat claimed)
+    ?gap        -> gap 583        (or "gap none"; like `day5.find_my_seat`)
+    ?snapshot   -> snapshot <claimed count> <hex bitmap of claimed seats>
+    anything bad -> error <message>
+
+Requests from every connection go through one bounded queue into a batching
+decoder, which wakes once per micro-batch rather than once per pass. Clients
+that outpace it block on the full queue and stop being read, so backpressure
+reaches them through their socket.
+"""
+import asyncio
+import typing as t
+
+from day5 import COLS, ROWS, SEAT_DATA, decode_seat_id
+
+GAP_QUERY = "?gap"
+SNAPSHOT_QUERY = "?snapshot"
+TOO_LONG = "error request too long"
+BITMAP_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+class SeatMap:
+    """Live occupancy of a single plane."""
+
+    def __init__(self, seats: int = ROWS * COLS):
+        self.claimed = bytearray(seats)
+        self.count = 0
+
+    def claim(self, seat_id: int):
+        if not self.claimed[seat_id]:
+            self.claimed[seat_id] = 1
+            self.count += 1
+
+    def find_gap(self) -> t.Optional[int]:
+        """Same rule as `day5.find_gap`, against the live state."""
+        claimed = self.claimed
+        for seat in range(1, len(claimed) - 1):
+            if not claimed[seat] and claimed[seat - 1] and claimed[seat + 1]:
+                return seat
+        return None
+
+    def snapshot(self) -> int:
+        """The claimed seats as a bitmap; bit n is seat ID n."""
+        return int(self.claimed[::-1].translate(BITMAP_DIGITS), 2)
+
+
+class SeatService:
+    def __init__(
+        self,
+        max_batch: int = 256,
+        latency_budget: float = 0.002,
+        queue_size: int = 1024,
+        seat_map: t.Optional[SeatMap] = None,
+    ):
+        self.max_batch = max_batch
+        self.latency_budget = latency_budget
+        self.seat_map = seat_map or SeatMap()
+        self.batches = 0
+        self.requests = 0
+        self._queue: "asyncio.Queue[t.Tuple[str, asyncio.Future]]" = (
+            asyncio.Queue(queue_size)
+        )
+        self._decoder: t.Optional[asyncio.Task] = None
+        self._server: t.Optional[asyncio.AbstractServer] = None
+
+    # ***** Decoding *****
+
+    async def submit(self, request: str) -> str:
+        """Queue a request and wait for its response line."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _next_batch(self) -> t.List[t.Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or
+        the latency budget for its first request is spent."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.latency_budget
+        while len(batch) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), remaining)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _handle(self, request: str) -> str:
+        if request == GAP_QUERY:
+            gap = self.seat_map.find_gap()
+            return f"gap {'none' if gap is None else gap}"
+        if request == SNAPSHOT_QUERY:
+            return (
+                f"snapshot {self.seat_map.count} {self.seat_map.snapshot():x}"
+            )
+
+        try:
+            seat_id = decode_seat_id(request)
+        except ValueError:
+            return f"error invalid seat hash {request!r}"
+        self.seat_map.claim(seat_id)
+        return str(seat_id)
+
+    async def _decode_forever(self):
+        while True:
+            batch = await self._next_batch()
+            self.batches += 1
+            self.requests += len(batch)
+            for request, future in batch:
+                if not future.cancelled():
+                    future.set_result(self._handle(request))
+
+    # ***** Connections *****
+
+    @staticmethod
+    async def _next_line(reader: asyncio.StreamReader) -> t.Optional[bytes]:
+        """The next line (b"" at EOF), or None for one over the reader's limit.
+
+        An overlong line is skipped through its newline, so its tail isn't
+        taken for another request.
+        """
+        overlong = False
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as error:
+                line = error.partial
+            except asyncio.LimitOverrunError as error:
+                await reader.readexactly(error.consumed)
+                overlong = True
+                continue
+            return None if overlong else line
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        pending: "asyncio.Queue[t.Optional[asyncio.Future]]" = asyncio.Queue(
+            self.max_batch
+        )
+
+        async def _respond():
+            connected = True
+            while True:
+                future = await pending.get()
+                if future is None:
+                    return
+                response = await future
+                if not connected:
+                    continue
+                try:
+                    writer.write((response + "\n").encode())
+                    await writer.drain()
+                except ConnectionError:
+                    # Keep draining `pending`, so the reader never blocks.
+                    connected = False
+
+        responder = asyncio.create_task(_respond())
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    raw = await self._next_line(reader)
+                except ConnectionError:
+                    break
+                future = loop.create_future()
+                if raw is None:
+                    future.set_result(TOO_LONG)
+                else:
+                    if not raw:
+                        break
+                    # Undecodable bytes become U+FFFD, which `_handle` rejects.
+                    request = raw.decode(errors="replace").strip()
+                    if not request:
+                        continue
+                    await self._queue.put((request, future))
+                await pending.put(future)
+            await pending.put(None)
+            await responder
+        finally:
+            responder.cancel()
+            writer.close()
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: t.Optional[str] = None,
+    ) -> t.Any:
+        """Listen on loopback TCP (or a unix socket at `path`).
+
+        Returns the bound address, so port 0 can be used to pick a free port.
+        """
+        self._decoder = asyncio.create_task(self._decode_forever())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._serve_client, path
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._serve_client, host, port
+            )
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._decoder is not None:
+            self._decoder.cancel()
+
+
+async def stream_passes(
+    host: str, port: int, requests: t.Iterable[str]
+) -> t.List[str]:
+    """Loopback client: send every request and collect one reply for each.
+
+    Replies are read while sending, so a throttled server can't deadlock us.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    requests = tuple(requests)
+
+    async def _send():
+        for request in requests:
+            writer.write((request + "\n").encode())
+            await writer.drain()
+        writer.write_eof()
+
+    async def _receive():
+        return [(await reader.readline()).decode().strip() for _ in requests]
+
+    _, responses = await asyncio.gather(_send(), _receive())
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+async def _demo() -> t.List[str]:
+    service = SeatService()
+    host, port = await service.start()
+    try:
+        ids = await stream_passes(host, port, SEAT_DATA)
+        queries = await stream_passes(host, port, (GAP_QUERY, "XXXX"))
+    finally:
+        await service.close()
+    print(f"{len(ids)} passes in {service.batches} batches")
+    return queries
+
+
+if __name__ == "__main__":
+    for line in asyncio.run(_demo()):
+        print(line)
@@ -0,0 +1,130 @@
+"""Find the day 5 gap while boarding passes are still streaming in.
+
+In the usual case the claimed seats form one contiguous block with exactly
+one seat missing, and that seat falls out of running aggregates: with
+`count` distinct seats between `low` and `high` there's a single gap when
+count == high - low, and it is the sum of low..high minus the running total
+(the running XOR cross-checks it). That answer costs O(1) and can be asked
+for after every pass.
+
+Whenever the stream isn't shaped like that (more than one gap, or nothing
+claimed around the gap yet) the answer comes from a claimed-seat bitmap
+instead. The bitmap is one bit per seat, so it is constant size too; it also
+spots duplicate passes, which are ignored so they can't skew the aggregates.
+"""
+import typing as t
+
+from day5 import COLS, ROWS, decode_seat_id
+from utils.parse import get_lines
+from utils.solvers import register
+
+
+def _range_sum(low: int, high: int) -> int:
+    return (low + high) * (high - low + 1) // 2
+
+
+def _xor_upto(n: int) -> int:
+    """0 ^ 1 ^ ... ^ n."""
+    return (n, 1, n + 1, 0)[n % 4]
+
+
+def _range_xor(low: int, high: int) -> int:
+    return _xor_upto(high) ^ _xor_upto(low - 1)
+
+
+class SeatGapStream:
+    def __init__(self, seats: int = ROWS * COLS):
+        self.seats = seats
+        self.claimed = bytearray((seats + 7) // 8)
+        self.count = 0
+        self.low = seats
+        self.high = -1
+        self.total = 0
+        self.xor = 0
+        self.duplicates = 0
+        # How many `gap` queries the aggregates answered, and how many needed
+        # the bitmap.
+        self.fast_answers = 0
+        self.bitmap_answers = 0
+
+    def add(self, seat_id: int):
+        if not 0 <= seat_id < self.seats:
+            raise ValueError(f"seat {seat_id} is outside the plane")
+        mask = 1 << (seat_id & 7)
+        if self.claimed[seat_id >> 3] & mask:
+            self.duplicates += 1
+            return
+        self.claimed[seat_id >> 3] |= mask
+        self.count += 1
+        self.low = min(self.low, seat_id)
+        self.high = max(self.high, seat_id)
+        self.total += seat_id
+        self.xor ^= seat_id
+
+    def add_pass(self, seat_hash: str) -> int:
+        seat_id = decode_seat_id(seat_hash)
+        self.add(seat_id)
+        return seat_id
+
+    def extend(self, seat_hashes: t.Iterable[str]):
+        for seat_hash in seat_hashes:
+            if seat_hash:
+                self.add(decode_seat_id(seat_hash))
+
+    def is_claimed(self, seat_id: int) -> bool:
+        return bool(self.claimed[seat_id >> 3] & (1 << (seat_id & 7)))
+
+    def single_gap(self) -> t.Optional[int]:
+        """The gap, if the aggregates describe a block missing one seat."""
+        if self.count < 2 or self.count != self.high - self.low:
+            return None
+        missing = _range_sum(self.low, self.high) - self.total
+        if not self.low < missing < self.high:
+            return None
+        if _range_xor(self.low, self.high) ^ self.xor != missing:
+            return None
+        return missing
+
+    def gap(self) -> t.Optional[int]:
+        """Same answer as `day5.find_gap` on every seat claimed so far."""
+        seat = self.single_gap()
+        if seat is not None:
+            self.fast_answers += 1
+            return seat
+
+        self.bitmap_answers += 1
+        for seat in range(max(1, self.low + 1), min(self.seats - 1, self.high)):
+            if (
+                not self.is_claimed(seat)
+                and self.is_claimed(seat - 1)
+                and self.is_claimed(seat + 1)
+            ):
+                return seat
+        return None
+
+
+@register(day=5, part=2, parse=get_lines, engine="stream")
+def find_my_seat_streaming(seat_hashes: t.Iterable[str]) -> int:
+    """`day5.find_my_seat`, in one pass over the passes."""
+    stream = SeatGapStream()
+    stream.extend(seat_hashes)
+    seat = stream.gap()
+    if seat is None:
+        raise ValueError("no unclaimed seat with claimed neighbours")
+    return seat
+
+
+if __name__ == "__main__":
+    import sys
+
+    from utils.parse import iter_lines
+
+    STREAM = SeatGapStream()
+    STREAM.extend(
+        iter_lines(sys.argv[1] if len(sys.argv) > 1 else "data/day5.txt")
+    )
+    print(STREAM.gap())
+    print(
+        f"{STREAM.count} seats claimed ({STREAM.duplicates} duplicate passes), "
+        f"answered from {'aggregates' if STREAM.fast_answers else 'the bitmap'}"
+    )
@@ -1,6 +1,9 @@
 from pathlib import Path
 import typing as t
-from functools import reduce
+from functools import lru_cache, reduce
+
+from utils.instrument import instrument
+from utils.solvers import register
 
 # ***** Parsing utils for test data *****
 
@@ -13,6 +16,7 @@ def _parse_group(group: str) -> t.Tuple[str, ...]:
     return tuple(group.split('\n'))
 
 
+@instrument()
 def parse_groups(data: str) -> t.Tuple[t.Tuple[str, ...], ...]:
     groups = _get_groups(data)
     return tuple(map(lambda g: _parse_group(g), groups))
@@ -38,10 +42,66 @@ def unanimous_questions_for_group(group: t.Tuple[str, ...]) -> t.Tuple[str, ...]
     )
 
 
+@register(day=6, part=2, parse=parse_groups, default_input="data/day6.txt")
 def count_group_questions(groups: t.Tuple[t.Tuple[str, ...], ...]) -> int:
     return reduce(lambda acc, g: acc + len(unanimous_questions_for_group(g)), groups, 0)
 
 
+# ***** Answer masks *****
+# One bit per question: 'a' is bit 0, 'z' is bit 25.
+
+
+def answer_mask(person: str) -> int:
+    """'abd' -> 0b1011"""
+    mask = 0
+    for q in person:
+        bit = ord(q) - ord("a")
+        if not 0 <= bit < 26:
+            raise ValueError(f"invalid answer {q!r} in {person!r}")
+        mask |= 1 << bit
+    return mask
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class AnswerMaskCache:
+    """Bounded LRU of answer string -> mask, for data full of repeat answers."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.mask = lru_cache(maxsize=maxsize)(answer_mask)
+
+    def info(self):
+        return self.mask.cache_info()
+
+    @property
+    def hit_rate(self) -> float:
+        info = self.info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.mask.cache_clear()
+
+
+MASK_CACHE = AnswerMaskCache()
+
+
+def unanimous_mask_for_group(
+    group: t.Tuple[str, ...], cache: AnswerMaskCache = MASK_CACHE
+) -> int:
+    return reduce(lambda acc, person: acc & cache.mask(person), group, -1)
+
+
+@register(day=6, part=2, parse=parse_groups, engine="masks")
+def count_group_questions_masked(
+    groups: t.Tuple[t.Tuple[str, ...], ...], cache: AnswerMaskCache = MASK_CACHE
+) -> int:
+    """`count_group_questions` via cached masks, not per-character counts."""
+    return sum(popcount(unanimous_mask_for_group(g, cache)) for g in groups)
+
+
 def count_all_questions(data: str) -> int:
     groups = parse_groups(data)
     return count_group_questions(groups)
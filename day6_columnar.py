@@ -0,0 +1,214 @@
+"""Day 6 answers as columns of masks, cached under `.cache/`.
+
+Each person becomes one uint32 answer mask, and `offsets[g]:offsets[g + 1]`
+is the slice of masks belonging to group g. The two arrays are written as raw
+native-endian files, with a small JSON header recording the input's size and
+mtime (or, for the registered engine, named by the text's digest). A warm run
+maps the files back in and casts them to integer memoryviews, so none of the
+text is split or scanned again. Every count (unanimous, union, the
+`GroupStats` histograms) runs straight off the arrays.
+"""
+import contextlib
+import json
+import mmap
+import os
+import sys
+import typing as t
+from array import array
+
+from day6 import MASK_CACHE, popcount
+from day6_stats import GroupStats
+from utils.cache import ResultCache, digest_text
+from utils.files import file_stamp, sidecar_path, write_atomic
+from utils.parse import parse_file
+from utils.solvers import ROOT, register
+
+Column = t.Union[array, memoryview]
+COLUMNS_DIRECTORY = str(ROOT / ".cache" / "columns")
+COLUMNS_MAX_BYTES = 1 << 24
+
+
+def cache_prefix(relative_path: str) -> str:
+    return sidecar_path(relative_path, ".columns")
+
+
+class ColumnarAnswers:
+    def __init__(self, masks: Column, offsets: Column):
+        self.masks = masks
+        self.offsets = offsets
+        self._maps: t.List[mmap.mmap] = []
+
+    @classmethod
+    def from_text(cls, data: str) -> "ColumnarAnswers":
+        """Split and scan the text once (like `day6.parse_groups`)."""
+        masks = array("I")
+        offsets = array("I", [0])
+        for group in data.split("\n\n"):
+            masks.extend(map(MASK_CACHE.mask, group.split("\n")))
+            offsets.append(len(masks))
+        return cls(masks, offsets)
+
+    @property
+    def groups(self) -> int:
+        return len(self.offsets) - 1
+
+    def group_masks(self) -> t.Iterator[Column]:
+        masks, offsets = self.masks, self.offsets
+        for g in range(len(offsets) - 1):
+            yield masks[offsets[g] : offsets[g + 1]]
+
+    def unanimous_total(self) -> int:
+        """Same as `day6.count_group_questions`."""
+        total = 0
+        for group in self.group_masks():
+            every = -1
+            for mask in group:
+                every &= mask
+            total += popcount(every)
+        return total
+
+    def union_total(self) -> int:
+        """Questions anyone in each group answered, summed over groups."""
+        total = 0
+        for group in self.group_masks():
+            anyone = 0
+            for mask in group:
+                anyone |= mask
+            total += popcount(anyone)
+        return total
+
+    def stats(self) -> GroupStats:
+        """Per-question counts and histograms, as `day6_stats` gathers them."""
+        stats = GroupStats()
+        for group in self.group_masks():
+            stats.add_masks(group)
+        return stats
+
+    def save(self, prefix: str, source: t.Optional[str] = None):
+        """Write `<prefix>.masks`, `<prefix>.offsets` and `<prefix>.json`.
+
+        The header goes last, so a reader never trusts half-written columns.
+        """
+        for suffix, column in (
+            ("masks", self.masks),
+            ("offsets", self.offsets),
+        ):
+            write_atomic(f"{prefix}.{suffix}", bytes(column))
+        header = {
+            "byteorder": sys.byteorder,
+            "itemsize": array("I").itemsize,
+            "people": len(self.masks),
+            "groups": self.groups,
+            "source": file_stamp(source) if source else None,
+        }
+        write_atomic(f"{prefix}.json", json.dumps(header))
+
+    @classmethod
+    def load(
+        cls, prefix: str, source: t.Optional[str] = None
+    ) -> t.Optional["ColumnarAnswers"]:
+        """Map saved columns back in; None if missing or stale."""
+        try:
+            with open(f"{prefix}.json") as f:
+                header = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if header.get("byteorder") != sys.byteorder:
+            return None
+        if header.get("itemsize") != array("I").itemsize:
+            return None
+        if source and header.get("source") != file_stamp(source):
+            return None
+
+        loaded = cls(array("I"), array("I"))
+        lengths = {"masks": header["people"], "offsets": header["groups"] + 1}
+        try:
+            for suffix, length in lengths.items():
+                setattr(
+                    loaded, suffix, loaded._map(f"{prefix}.{suffix}", length)
+                )
+        except (FileNotFoundError, ValueError):
+            loaded.close()
+            return None
+        return loaded
+
+    def _map(self, path: str, length: int) -> Column:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size != length * array("I").itemsize:
+                raise ValueError(f"{path} doesn't match its header")
+            if not length:
+                return array("I")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast("I")
+
+    def close(self):
+        for column in (self.masks, self.offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self) -> "ColumnarAnswers":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def cached_columns(relative_path: str) -> ColumnarAnswers:
+    """Columns for an input file, converting and saving them if needed."""
+    prefix = cache_prefix(relative_path)
+    loaded = ColumnarAnswers.load(prefix, relative_path)
+    if loaded is not None:
+        return loaded
+    ColumnarAnswers.from_text(parse_file(relative_path)).save(
+        prefix, relative_path
+    )
+    loaded = ColumnarAnswers.load(prefix, relative_path)
+    assert loaded is not None
+    return loaded
+
+
+def columns_for_text(
+    data: str,
+    directory: str = COLUMNS_DIRECTORY,
+    max_bytes: int = COLUMNS_MAX_BYTES,
+) -> ColumnarAnswers:
+    """`cached_columns` for text rather than a file, keyed by its digest.
+
+    This is the parse `run.py` and `bench.py` use, since they hand solvers
+    text; only the hashing is repeated on a warm run. Column sets are evicted
+    least recently used first, as `ResultCache` evicts answers, once
+    `directory` outgrows `max_bytes`.
+    """
+    prefix = os.path.join(directory, digest_text(data))
+    loaded = ColumnarAnswers.load(prefix)
+    if loaded is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(f"{prefix}.json")
+        return loaded
+    columns = ColumnarAnswers.from_text(data)
+    os.makedirs(directory, exist_ok=True)
+    columns.save(prefix)
+    ResultCache(directory, max_bytes).evict()
+    return columns
+
+
+def _unanimous_total(columns: ColumnarAnswers) -> int:
+    with columns:
+        return columns.unanimous_total()
+
+
+register(day=6, part=2, parse=columns_for_text, engine="columnar")(
+    _unanimous_total
+)
+
+
+if __name__ == "__main__":
+    PATH = sys.argv[1] if len(sys.argv) > 1 else "data/day6.txt"
+    with cached_columns(PATH) as COLUMNS:
+        print(COLUMNS.unanimous_total())
+        print(f"anyone answered: {COLUMNS.union_total()}")
+        print(json.dumps(COLUMNS.stats().as_dict()["by_size"]))
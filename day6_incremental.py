@@ -0,0 +1,118 @@
+"""Incremental day 6 totals for an append-only input file.
+
+A checkpoint records the byte offset just past the last complete group (one
+followed by a blank line) and the total for everything before it. A re-run
+seeks straight to that offset and only reads what was appended since. The
+trailing group may still be growing, so it is counted in the answer but never
+checkpointed.
+
+Lines may end in "\n" or "\r\n", as `parse_file`'s universal newlines allow.
+"""
+import json
+import os
+import re
+import typing as t
+from dataclasses import asdict, dataclass
+
+from day6 import popcount, unanimous_mask_for_group
+from utils.files import sidecar_path, write_atomic
+
+# A blank line, with either line ending.
+SEPARATOR = re.compile(rb"\r?\n\r?\n")
+CHUNK_SIZE = 1 << 20
+# Bytes before the offset that must still match for a checkpoint to be reused.
+FINGERPRINT_SIZE = 64
+
+
+@dataclass
+class Checkpoint:
+    offset: int = 0
+    total: int = 0
+    groups: int = 0
+    fingerprint: str = ""
+
+
+def checkpoint_path(relative_path: str) -> str:
+    return sidecar_path(relative_path, ".day6.json")
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """The saved checkpoint; an empty one if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return Checkpoint(**json.load(f))
+    except (FileNotFoundError, ValueError, TypeError):
+        return Checkpoint()
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint):
+    """Written atomically, so a crash never leaves half a checkpoint."""
+    write_atomic(path, json.dumps(asdict(checkpoint)))
+
+
+def _group_count(group: bytes) -> int:
+    people = tuple(group.decode().replace("\r\n", "\n").split("\n"))
+    return popcount(unanimous_mask_for_group(people))
+
+
+def _fingerprint(f: t.BinaryIO, offset: int) -> str:
+    start = max(0, offset - FINGERPRINT_SIZE)
+    f.seek(start)
+    return f.read(offset - start).hex()
+
+
+def _is_valid(f: t.BinaryIO, size: int, checkpoint: Checkpoint) -> bool:
+    """The file must not have shrunk or been rewritten before the offset."""
+    if checkpoint.offset > size:
+        return False
+    return _fingerprint(f, checkpoint.offset) == checkpoint.fingerprint
+
+
+def count_appended(
+    relative_path: str, checkpoint_file: t.Optional[str] = None
+) -> t.Tuple[int, Checkpoint]:
+    """Same answer as `day6.count_all_questions` on the whole file.
+
+    Returns the answer and the new checkpoint, which has already been saved.
+    """
+    checkpoint_file = checkpoint_file or checkpoint_path(relative_path)
+    checkpoint = load_checkpoint(checkpoint_file)
+
+    with open(relative_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not _is_valid(f, size, checkpoint):
+            checkpoint = Checkpoint()
+
+        offset = checkpoint.offset
+        total = checkpoint.total
+        groups = checkpoint.groups
+        f.seek(offset)
+        buffer = b""
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            start = 0
+            for separator in SEPARATOR.finditer(buffer):
+                total += _group_count(buffer[start : separator.start()])
+                groups += 1
+                start = separator.end()
+            offset += start
+            buffer = buffer[start:]
+
+        checkpoint = Checkpoint(offset, total, groups, _fingerprint(f, offset))
+
+    save_checkpoint(checkpoint_file, checkpoint)
+    return (total + _group_count(buffer), checkpoint)
+
+
+if __name__ == "__main__":
+    import sys
+
+    PATH = sys.argv[1] if len(sys.argv) > 1 else "data/day6.txt"
+    answer, saved = count_appended(PATH)
+    print(answer)
+    print(
+        f"checkpoint: {saved.groups} complete groups up to byte {saved.offset}"
+    )
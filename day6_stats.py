@@ -0,0 +1,137 @@
+"""Per-question statistics over day 6 groups, gathered in one pass.
+
+All counters live in fixed-size integer arrays. Stats for separate chunks of
+the input can be merged, so big surveys can be split across processes.
+"""
+import typing as t
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from day6 import MASK_CACHE, AnswerMaskCache, parse_groups
+
+QUESTIONS = 26
+
+
+def _counters(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+@dataclass
+class GroupStats:
+    groups: int = 0
+    people: int = 0
+    # groups where everyone / anyone answered question q
+    unanimous: array = field(default_factory=lambda: _counters(QUESTIONS))
+    answered: array = field(default_factory=lambda: _counters(QUESTIONS))
+    # by_size[s][c]: (group, question) pairs where c of the s people answered
+    by_size: t.List[array] = field(default_factory=lambda: [_counters(1)])
+
+    def _size_counters(self, size: int) -> array:
+        while len(self.by_size) <= size:
+            self.by_size.append(_counters(len(self.by_size) + 1))
+        return self.by_size[size]
+
+    def add_masks(self, masks: t.Sequence[int]):
+        """Count one group given each person's answer mask."""
+        size = len(masks)
+        self.groups += 1
+        self.people += size
+
+        every, anyone = -1, 0
+        for mask in masks:
+            every &= mask
+            anyone |= mask
+
+        counts = self._size_counters(size)
+        for q in range(QUESTIONS):
+            bit = 1 << q
+            if not anyone & bit:
+                counts[0] += 1
+                continue
+            self.answered[q] += 1
+            if every & bit:
+                self.unanimous[q] += 1
+                counts[size] += 1
+            else:
+                counts[sum(1 for m in masks if m & bit)] += 1
+
+    def add_group(
+        self, group: t.Tuple[str, ...], cache: AnswerMaskCache = MASK_CACHE
+    ):
+        self.add_masks(tuple(map(cache.mask, group)))
+
+    def merge(self, other: "GroupStats") -> "GroupStats":
+        """Fold `other` into these stats, in place."""
+        self.groups += other.groups
+        self.people += other.people
+        for q in range(QUESTIONS):
+            self.unanimous[q] += other.unanimous[q]
+            self.answered[q] += other.answered[q]
+        for size, counts in enumerate(other.by_size):
+            mine = self._size_counters(size)
+            for c, n in enumerate(counts):
+                mine[c] += n
+        return self
+
+    @property
+    def unanimous_total(self) -> int:
+        """Same as `day6.count_group_questions`."""
+        return sum(self.unanimous)
+
+    @property
+    def answered_total(self) -> int:
+        return sum(self.answered)
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        letters = [chr(ord("a") + q) for q in range(QUESTIONS)]
+        return {
+            "groups": self.groups,
+            "people": self.people,
+            "unanimous": dict(zip(letters, self.unanimous)),
+            "answered": dict(zip(letters, self.answered)),
+            "by_size": {
+                size: list(counts)
+                for size, counts in enumerate(self.by_size)
+                if any(counts)
+            },
+        }
+
+
+def stats_for_groups(groups: t.Iterable[t.Tuple[str, ...]]) -> GroupStats:
+    stats = GroupStats()
+    for group in groups:
+        stats.add_group(group)
+    return stats
+
+
+def _stats_for_text(data: str) -> GroupStats:
+    return stats_for_groups(parse_groups(data))
+
+
+def stats_parallel(data: str, chunks: int = 4) -> GroupStats:
+    """Split the input on group boundaries and gather stats per process."""
+    groups = data.split("\n\n")
+    step = max(1, -(-len(groups) // chunks))
+    parts = [
+        "\n\n".join(groups[i : i + step]) for i in range(0, len(groups), step)
+    ]
+    with ProcessPoolExecutor(chunks) as pool:
+        results = list(pool.map(_stats_for_text, parts))
+    return sum_stats(results)
+
+
+def sum_stats(results: t.Iterable[GroupStats]) -> GroupStats:
+    total = GroupStats()
+    for stats in results:
+        total.merge(stats)
+    return total
+
+
+if __name__ == "__main__":
+    import json
+    from pathlib import Path
+
+    print(
+        json.dumps(stats_parallel(Path("data/day6.txt").read_text()).as_dict())
+    )
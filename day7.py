@@ -1,9 +1,14 @@
 """Day 7, parts 1 and 2."""
 import re
 import typing as t
-from functools import reduce
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import partial, reduce
 from pathlib import Path
 
+from utils.instrument import instrument
+from utils.solvers import register
+
 
 def _parse_container_contents(rule_line: str) -> t.Tuple[str, str]:
     """
@@ -54,6 +59,7 @@ def _get_rules(data: str) -> t.Tuple[str, ...]:
     return tuple(data.split("\n"))
 
 
+@instrument()
 def parse_rules(data: str) -> t.Dict[str, t.Dict[str, int]]:
     """Transform input data into:
     {
@@ -126,8 +132,133 @@ def get_shiny_gold_container_count(data):
     return get_bag_count("shiny gold", rules)
 
 
+# ***** Iterative traversal *****
+# Explicit stacks instead of recursion, so nesting depth is only limited by
+# memory, and each bag is expanded once rather than once per path to it.
+
+
+@dataclass
+class TraversalStats:
+    nodes_visited: int = 0
+    edges_relaxed: int = 0
+    max_depth: int = 0
+
+    def visit(self, depth: int):
+        self.nodes_visited += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+def get_content_bag_count_iterative(
+    target_bag: str,
+    rules: t.Dict[str, t.Dict[str, int]],
+    stats: t.Optional[TraversalStats] = None,
+) -> int:
+    """`get_content_bag_count`, bottom-up with memoised totals."""
+    stats = stats if stats is not None else TraversalStats()
+    totals: t.Dict[str, int] = {}
+    opened = set()
+    stack = [(target_bag, 0, False)]
+    while stack:
+        bag, depth, expanded = stack.pop()
+        if bag in totals:
+            continue
+        contents = rules[bag]
+        if not expanded:
+            if bag in opened:
+                continue
+            opened.add(bag)
+            stats.visit(depth)
+            stack.append((bag, depth, True))
+            stack.extend(
+                (b, depth + 1, False) for b in contents if b not in totals
+            )
+            continue
+
+        total = 0
+        for content_bag, count in contents.items():
+            stats.edges_relaxed += 1
+            total += count * (1 + totals[content_bag])
+        totals[bag] = total
+    return totals[target_bag]
+
+
+def can_contain_iterative(
+    target_bag: str,
+    possible_content_bag: str,
+    rules: t.Dict[str, t.Dict[str, int]],
+    stats: t.Optional[TraversalStats] = None,
+) -> bool:
+    """`can_contain`, depth first, visiting each bag at most once."""
+    stats = stats if stats is not None else TraversalStats()
+    seen = {target_bag}
+    stack = [(target_bag, 0)]
+    while stack:
+        bag, depth = stack.pop()
+        stats.visit(depth)
+        for content_bag in rules[bag]:
+            stats.edges_relaxed += 1
+            if content_bag == possible_content_bag:
+                return True
+            if content_bag not in seen:
+                seen.add(content_bag)
+                stack.append((content_bag, depth + 1))
+    return False
+
+
+def get_bag_count_iterative(
+    possible_content_bag: str,
+    rules: t.Dict[str, t.Dict[str, int]],
+    stats: t.Optional[TraversalStats] = None,
+) -> int:
+    """`get_bag_count`, walking outwards from the content bag once.
+
+    Depth here counts levels of containers around `possible_content_bag`.
+    """
+    stats = stats if stats is not None else TraversalStats()
+    containers = defaultdict(list)
+    for bag, contents in rules.items():
+        for content_bag in contents:
+            containers[content_bag].append(bag)
+
+    seen = set()
+    stack = [(possible_content_bag, 0)]
+    while stack:
+        bag, depth = stack.pop()
+        stats.visit(depth)
+        for container in containers[bag]:
+            stats.edges_relaxed += 1
+            if container not in seen:
+                seen.add(container)
+                stack.append((container, depth + 1))
+    return len(seen)
+
+
+def profile_rules(
+    rules: t.Dict[str, t.Dict[str, int]], bag: str = "shiny gold"
+) -> t.Dict[str, TraversalStats]:
+    """Traversal stats for both questions about `bag`, without recursion."""
+    outward, inward = TraversalStats(), TraversalStats()
+    get_bag_count_iterative(bag, rules, outward)
+    get_content_bag_count_iterative(bag, rules, inward)
+    return {"containers": outward, "contents": inward}
+
+
 # ***************************
 
+register(day=7, part=1, parse=parse_rules, default_input="data/day7.txt")(
+    partial(get_bag_count, "shiny gold")
+)
+register(day=7, part=2, parse=parse_rules, default_input="data/day7.txt")(
+    partial(get_content_bag_count, "shiny gold")
+)
+register(day=7, part=1, parse=parse_rules, engine="iterative")(
+    partial(get_bag_count_iterative, "shiny gold")
+)
+register(day=7, part=2, parse=parse_rules, engine="iterative")(
+    partial(get_content_bag_count_iterative, "shiny gold")
+)
+
 
 if __name__ == "__main__":
     DATA = Path("data/day7.txt").read_text()
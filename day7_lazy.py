@@ -0,0 +1,129 @@
+"""Lazily parsed day 7 rules, for queries that only touch part of the graph.
+
+An offset index maps each container colour to the byte range of its rule
+line, found with a plain substring search rather than the rule regexes. Lines
+are only parsed when a traversal first asks for that colour, so the cost of a
+query like `get_content_bag_count` follows the subgraph it reaches rather than
+the size of the file. The index is saved under `.cache/sidecars` and reused
+for as long as the file is unchanged.
+"""
+import json
+import mmap
+import os
+import typing as t
+
+from day7 import _parse_contents
+from utils.files import file_stamp, sidecar_path, write_atomic
+
+OffsetIndex = t.Dict[str, t.Tuple[int, int]]
+MARKER = b" bags contain "
+
+
+def build_offset_index(relative_path: str) -> OffsetIndex:
+    """colour -> (offset, length) of its rule line."""
+    index: OffsetIndex = {}
+    offset = 0
+    with open(relative_path, "rb") as f:
+        for line in f:
+            end = line.find(MARKER)
+            if end > 0:
+                index[line[:end].decode()] = (offset, len(line.rstrip(b"\n")))
+            offset += len(line)
+    return index
+
+
+def index_path(relative_path: str) -> str:
+    return sidecar_path(relative_path, ".index.json")
+
+
+def save_offset_index(
+    relative_path: str, index: OffsetIndex, path: t.Optional[str] = None
+):
+    path = path or index_path(relative_path)
+    saved = {"stamp": file_stamp(relative_path), "index": index}
+    write_atomic(path, json.dumps(saved))
+
+
+def load_offset_index(
+    relative_path: str, path: t.Optional[str] = None
+) -> OffsetIndex:
+    """Reuse a saved index if the rule file hasn't changed; else rebuild it."""
+    path = path or index_path(relative_path)
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+        if saved["stamp"] == file_stamp(relative_path):
+            return {c: (o, n) for c, (o, n) in saved["index"].items()}
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    index = build_offset_index(relative_path)
+    save_offset_index(relative_path, index, path)
+    return index
+
+
+class LazyRules(t.Mapping[str, t.Dict[str, int]]):
+    """A read-only stand-in for `day7.parse_rules` output that parses on demand.
+
+    Pass it anywhere the day 7 functions take `rules`.
+    """
+
+    def __init__(
+        self, relative_path: str, index: t.Optional[OffsetIndex] = None
+    ):
+        if index is None:
+            index = load_offset_index(relative_path)
+        self.index = index
+        self._file = open(relative_path, "rb")
+        self._data: t.Union[mmap.mmap, bytes] = b""
+        if os.fstat(self._file.fileno()).st_size:
+            self._data = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self._parsed: t.Dict[str, t.Dict[str, int]] = {}
+
+    def __getitem__(self, colour: str) -> t.Dict[str, int]:
+        contents = self._parsed.get(colour)
+        if contents is None:
+            offset, length = self.index[colour]
+            line = self._data[offset : offset + length].decode()
+            body = line[len(colour) + len(MARKER) : -1]
+            contents = self._parsed[colour] = dict(_parse_contents(body))
+        return contents
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, colour: object) -> bool:
+        return colour in self.index
+
+    @property
+    def parsed_count(self) -> int:
+        """How many rule lines have been parsed so far."""
+        return len(self._parsed)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "LazyRules":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from day7 import get_content_bag_count_iterative
+
+    with LazyRules(
+        sys.argv[1] if len(sys.argv) > 1 else "data/day7.txt"
+    ) as RULES:
+        print(get_content_bag_count_iterative("shiny gold", RULES))
+        print(f"parsed {RULES.parsed_count} of {len(RULES)} rules")
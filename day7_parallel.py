@@ -0,0 +1,144 @@
+"""Parse day 7 rule files across processes.
+
+The file is cut into byte ranges on line boundaries and each worker parses
+its own range, straight from disk. Workers intern colours locally and send
+back integer edge arrays; the parent remaps them onto one global colour table.
+"""
+import os
+import typing as t
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from day7 import (
+    get_bag_count_iterative,
+    get_content_bag_count_iterative,
+    parse_rule,
+)
+from utils.solvers import register
+
+Rules = t.Dict[str, t.Dict[str, int]]
+
+
+@dataclass
+class InternedRules:
+    """Rules as parallel edge arrays over a colour table.
+
+    Edge i says colour `sources[i]` directly holds `counts[i]` of colour
+    `targets[i]`. `containers` lists every colour that has a rule line.
+    """
+
+    colours: t.List[str] = field(default_factory=list)
+    containers: array = field(default_factory=lambda: array("i"))
+    sources: array = field(default_factory=lambda: array("i"))
+    targets: array = field(default_factory=lambda: array("i"))
+    counts: array = field(default_factory=lambda: array("i"))
+
+    def intern(self, colour: str, ids: t.Dict[str, int]) -> int:
+        colour_id = ids.get(colour)
+        if colour_id is None:
+            colour_id = ids[colour] = len(self.colours)
+            self.colours.append(colour)
+        return colour_id
+
+    def to_rules(self) -> Rules:
+        """The same dict-of-dicts `day7.parse_rules` builds."""
+        rules: Rules = {self.colours[c]: {} for c in self.containers}
+        edges = zip(self.sources, self.targets, self.counts)
+        for source, target, count in edges:
+            rules[self.colours[source]][self.colours[target]] = count
+        return rules
+
+
+def _parse_lines(lines: t.Iterable[str]) -> InternedRules:
+    parsed = InternedRules()
+    ids: t.Dict[str, int] = {}
+    for line in lines:
+        if not line:
+            continue
+        container, contents = parse_rule(line)
+        source = parsed.intern(container, ids)
+        parsed.containers.append(source)
+        for colour, count in contents:
+            parsed.sources.append(source)
+            parsed.targets.append(parsed.intern(colour, ids))
+            parsed.counts.append(count)
+    return parsed
+
+
+def _parse_range(job: t.Tuple[str, int, int]) -> InternedRules:
+    path, start, end = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _parse_lines(data.decode().split("\n"))
+
+
+def _parse_text(data: str) -> InternedRules:
+    return _parse_lines(data.split("\n"))
+
+
+def line_ranges(path: str, parts: int) -> t.List[t.Tuple[int, int]]:
+    """Split a file into about `parts` byte ranges, each ending at a newline."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for part in range(1, parts):
+            f.seek(max(bounds[-1], size * part // parts))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def merge(chunks: t.Iterable[InternedRules]) -> InternedRules:
+    """Remap each chunk's local colour ids onto one global table."""
+    merged = InternedRules()
+    ids: t.Dict[str, int] = {}
+    for chunk in chunks:
+        remap = array("i", (merged.intern(c, ids) for c in chunk.colours))
+        merged.containers.extend(remap[c] for c in chunk.containers)
+        merged.sources.extend(remap[c] for c in chunk.sources)
+        merged.targets.extend(remap[c] for c in chunk.targets)
+        merged.counts.extend(chunk.counts)
+    return merged
+
+
+def parse_file_parallel(
+    path: str, processes: t.Optional[int] = None
+) -> InternedRules:
+    """Parse a rule file with each worker reading its own byte range."""
+    processes = processes or os.cpu_count() or 1
+    jobs = [(path, start, end) for start, end in line_ranges(path, processes)]
+    with ProcessPoolExecutor(processes) as pool:
+        return merge(pool.map(_parse_range, jobs))
+
+
+def parse_text_parallel(
+    data: str, processes: t.Optional[int] = None
+) -> InternedRules:
+    """As `parse_file_parallel`, for input that's already in memory."""
+    processes = processes or os.cpu_count() or 1
+    lines = data.split("\n")
+    step = max(1, -(-len(lines) // processes))
+    chunks = [
+        "\n".join(lines[i : i + step]) for i in range(0, len(lines), step)
+    ]
+    with ProcessPoolExecutor(processes) as pool:
+        return merge(pool.map(_parse_text, chunks))
+
+
+def parse_rules_parallel(data: str) -> Rules:
+    return parse_text_parallel(data).to_rules()
+
+
+register(day=7, part=1, parse=parse_rules_parallel, engine="parallel")(
+    lambda rules: get_bag_count_iterative("shiny gold", rules)
+)
+register(day=7, part=2, parse=parse_rules_parallel, engine="parallel")(
+    lambda rules: get_content_bag_count_iterative("shiny gold", rules)
+)
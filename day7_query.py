@@ -0,0 +1,182 @@
+"""Arbitrary "how many X are inside Y" queries over parsed day 7 rules.
+
+Colours are interned to integers and ranked in topological order once. The
+full nested multiplicity vector of a source bag (how many of every other bag
+one of it holds) is built children-first in that order, reusing the vectors
+of any children already computed. Vectors are memoised per source in a
+bounded LRU, so batches of queries share their common sub-graphs without
+memory growing with the number of sources asked about.
+"""
+import typing as t
+from collections import OrderedDict, defaultdict
+
+from day7 import parse_rules
+from utils.solvers import register
+
+Rules = t.Dict[str, t.Dict[str, int]]
+Vector = t.Dict[int, int]
+
+
+def topological_order(
+    edges: t.Sequence[t.Sequence[t.Tuple[int, int]]],
+) -> t.List[int]:
+    """Containers before contents (Kahn's algorithm)."""
+    indegree = [0] * len(edges)
+    for contents in edges:
+        for child, _ in contents:
+            indegree[child] += 1
+
+    ready = [node for node, degree in enumerate(indegree) if degree == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for child, _ in edges[node]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(edges):
+        raise ValueError("bag rules contain a cycle")
+    return order
+
+
+class RuleGraph:
+    def __init__(self, rules: Rules, max_cached: int = 1024):
+        colours = set(rules)
+        for contents in rules.values():
+            colours.update(contents)
+        self.colours = sorted(colours)
+        self.ids = {colour: i for i, colour in enumerate(self.colours)}
+        self.edges = [
+            tuple((self.ids[c], n) for c, n in rules.get(colour, {}).items())
+            for colour in self.colours
+        ]
+        self.rank = [0] * len(self.colours)
+        for position, node in enumerate(topological_order(self.edges)):
+            self.rank[node] = position
+        self._bottom_up = sorted(
+            range(len(self.colours)), key=self.rank.__getitem__, reverse=True
+        )
+        contained = {child for contents in self.edges for child, _ in contents}
+        self.top_level = tuple(
+            i for i in range(len(self.colours)) if i not in contained
+        )
+
+        self.max_cached = max_cached
+        self._vectors: "OrderedDict[int, Vector]" = OrderedDict()
+        self._targets: "OrderedDict[int, t.List[int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, cache: OrderedDict, key: int, value: t.Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
+    def _vector(self, source: int) -> Vector:
+        """Nested multiplicities for one `source` bag, memoised."""
+        cached = self._vectors.get(source)
+        if cached is not None:
+            self.hits += 1
+            self._vectors.move_to_end(source)
+            return cached
+        self.misses += 1
+
+        # Gather the uncached part of the subgraph below `source`...
+        local: t.Dict[int, Vector] = {}
+        pending = set()
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            if node in pending:
+                continue
+            if node in self._vectors:
+                local[node] = self._vectors[node]
+                continue
+            pending.add(node)
+            stack.extend(child for child, _ in self.edges[node])
+
+        # ...and fill it in children first.
+        for node in sorted(pending, key=self.rank.__getitem__, reverse=True):
+            vector: Vector = defaultdict(int)
+            for child, count in self.edges[node]:
+                vector[child] += count
+                for inner, inner_count in local[child].items():
+                    vector[inner] += count * inner_count
+            local[node] = dict(vector)
+            self._remember(self._vectors, node, local[node])
+        return local[source]
+
+    def count(self, container: str, content: str) -> int:
+        """How many `content` bags one `container` holds, at any depth."""
+        return self._vector(self.ids[container]).get(self.ids[content], 0)
+
+    def total(self, container: str) -> int:
+        """Same as `day7.get_content_bag_count`."""
+        return sum(self._vector(self.ids[container]).values())
+
+    def count_many(self, pairs: t.Iterable[t.Tuple[str, str]]) -> t.List[int]:
+        """Answer many (container, content) pairs, one vector per container.
+
+        Containers are visited deepest first, so shallower ones find the
+        vectors of the bags inside them already computed.
+        """
+        pairs = list(pairs)
+        by_source = defaultdict(list)
+        for position, (container, content) in enumerate(pairs):
+            by_source[self.ids[container]].append((position, self.ids[content]))
+
+        answers = [0] * len(pairs)
+        for source in sorted(
+            by_source, key=self.rank.__getitem__, reverse=True
+        ):
+            vector = self._vector(source)
+            for position, content in by_source[source]:
+                answers[position] = vector.get(content, 0)
+        return answers
+
+    def _containing(self, target: int) -> t.List[int]:
+        """How many `target` bags each bag holds; contents before containers."""
+        cached = self._targets.get(target)
+        if cached is not None:
+            self._targets.move_to_end(target)
+            return cached
+
+        held = [0] * len(self.colours)
+        for node in self._bottom_up:
+            held[node] = sum(
+                count * ((child == target) + held[child])
+                for child, count in self.edges[node]
+            )
+        self._remember(self._targets, target, held)
+        return held
+
+    def containers(self, content: str) -> t.Tuple[str, ...]:
+        """Every bag that holds `content` (like `day7.get_bag_count`)."""
+        held = self._containing(self.ids[content])
+        return tuple(c for c, n in zip(self.colours, held) if n)
+
+    def top_containers(
+        self, content: str, limit: int = 10
+    ) -> t.List[t.Tuple[str, int]]:
+        """Top-level bags holding the most `content` bags."""
+        held = self._containing(self.ids[content])
+        ranked = sorted(
+            ((self.colours[i], held[i]) for i in self.top_level if held[i]),
+            key=lambda pair: (-pair[1], pair[0]),
+        )
+        return ranked[:limit]
+
+
+def parse_graph(data: str) -> RuleGraph:
+    return RuleGraph(parse_rules(data))
+
+
+register(day=7, part=1, parse=parse_graph, engine="graph")(
+    lambda graph: len(graph.containers("shiny gold"))
+)
+register(day=7, part=2, parse=parse_graph, engine="graph")(
+    lambda graph: graph.total("shiny gold")
+)
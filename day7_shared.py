@@ -0,0 +1,288 @@
+"""Serve one read-only day 7 rule graph to many processes from shared memory.
+
+The graph is published once as a CSR (compressed sparse row) block: colour
+ids are ranks in sorted colour order, the edges out of colour i are
+`targets[offsets[i]:offsets[i + 1]]` with their `counts`, and a reverse CSR
+lists the colours that directly hold each colour. Colour names are stored as
+one UTF-8 blob with their own offsets, and looked up by binary search, so no
+process needs a dict of colours either.
+
+Workers attach by name and read the block through memoryviews, so each new
+worker adds only a mapping of the same pages, not a copy of the graph.
+
+    with SharedRuleGraph.publish(parse_file_parallel(path)) as graph:
+        pool = ProcessPoolExecutor(
+            initializer=attach_worker, initargs=(graph.name,)
+        )
+"""
+import struct
+import typing as t
+from array import array
+from multiprocessing import shared_memory
+
+from day7_parallel import InternedRules, _parse_lines
+from utils.solvers import register
+
+MAGIC = b"BAG7"
+# Magic, colours, edges, bytes of colour names.
+HEADER = struct.Struct("<4sIII")
+ITEM_SIZE = array("i").itemsize
+
+
+def _layout(colours: int, edges: int) -> t.List[t.Tuple[str, int]]:
+    """(array name, length) of each int32 array, in block order."""
+    return [
+        ("offsets", colours + 1),
+        ("targets", edges),
+        ("counts", edges),
+        ("reverse_offsets", colours + 1),
+        ("sources", edges),
+        ("name_offsets", colours + 1),
+    ]
+
+
+def _csr(
+    size: int, rows: t.Sequence[int], columns: t.Sequence[int]
+) -> t.Tuple[array, t.List[int]]:
+    """Offsets and the edge order that groups edges by row."""
+    offsets = array("i", [0] * (size + 1))
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    order = sorted(range(len(rows)), key=lambda e: (rows[e], columns[e]))
+    return offsets, order
+
+
+class SharedRuleGraph:
+    """A CSR rule graph living in a `SharedMemory` block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        magic, colours, edges, names_size = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name} doesn't hold a day 7 rule graph")
+        self.size = colours
+        self.edges = edges
+
+        position = HEADER.size
+        views: t.List[memoryview] = []
+        for _, length in _layout(colours, edges):
+            end = position + length * ITEM_SIZE
+            views.append(shm.buf[position:end].cast("i"))
+            position = end
+        # In `_layout` order.
+        (
+            self.offsets,
+            self.targets,
+            self.counts,
+            self.reverse_offsets,
+            self.sources,
+            self.name_offsets,
+        ) = views
+        self.names = shm.buf[position : position + names_size]
+        self._views = views + [self.names]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def publish(
+        cls, interned: InternedRules, name: t.Optional[str] = None
+    ) -> "SharedRuleGraph":
+        """Copy a graph into a new shared block; the caller owns the block."""
+        encoded = [colour.encode() for colour in interned.colours]
+        rank = sorted(range(len(encoded)), key=encoded.__getitem__)
+        new_id = [0] * len(rank)
+        for position, old in enumerate(rank):
+            new_id[old] = position
+
+        size = len(encoded)
+        sources = [new_id[c] for c in interned.sources]
+        targets = [new_id[c] for c in interned.targets]
+        offsets, order = _csr(size, sources, targets)
+        reverse_offsets, reverse_order = _csr(size, targets, sources)
+        name_offsets = array("i", [0])
+        for old in rank:
+            name_offsets.append(name_offsets[-1] + len(encoded[old]))
+        names = b"".join(encoded[old] for old in rank)
+
+        arrays = {
+            "offsets": offsets,
+            "targets": array("i", (targets[e] for e in order)),
+            "counts": array("i", (interned.counts[e] for e in order)),
+            "reverse_offsets": reverse_offsets,
+            "sources": array("i", (sources[e] for e in reverse_order)),
+            "name_offsets": name_offsets,
+        }
+        edges = len(sources)
+        total = HEADER.size + sum(
+            length * ITEM_SIZE for _, length in _layout(size, edges)
+        )
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=max(1, total + len(names))
+        )
+        HEADER.pack_into(shm.buf, 0, MAGIC, size, edges, len(names))
+        position = HEADER.size
+        for array_name, _ in _layout(size, edges):
+            data = arrays[array_name].tobytes()
+            shm.buf[position : position + len(data)] = data
+            position += len(data)
+        shm.buf[position : position + len(names)] = names
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRuleGraph":
+        return cls(shared_memory.SharedMemory(name=name))
+
+    def colour(self, colour_id: int) -> str:
+        start, end = (
+            self.name_offsets[colour_id],
+            self.name_offsets[colour_id + 1],
+        )
+        return bytes(self.names[start:end]).decode()
+
+    def colour_id(self, colour: str) -> int:
+        """Binary search of the sorted colour table; KeyError if absent."""
+        key = colour.encode()
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            start, end = (
+                self.name_offsets[middle],
+                self.name_offsets[middle + 1],
+            )
+            if bytes(self.names[start:end]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self.colour(low) == colour:
+            return low
+        raise KeyError(colour)
+
+    def contents(self, colour_id: int) -> t.Iterator[t.Tuple[int, int]]:
+        """(colour id, count) of every bag directly inside `colour_id`."""
+        for edge in range(self.offsets[colour_id], self.offsets[colour_id + 1]):
+            yield self.targets[edge], self.counts[edge]
+
+    def get_content_bag_count(self, target_bag: str) -> int:
+        """`day7.get_content_bag_count`, against the shared buffers."""
+        offsets, targets, counts = self.offsets, self.targets, self.counts
+        totals: t.Dict[int, int] = {}
+        root = self.colour_id(target_bag)
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in totals:
+                continue
+            first, last = offsets[node], offsets[node + 1]
+            if not expanded:
+                stack.append((node, True))
+                stack.extend(
+                    (targets[e], False)
+                    for e in range(first, last)
+                    if targets[e] not in totals
+                )
+                continue
+            totals[node] = sum(
+                counts[e] * (1 + totals[targets[e]]) for e in range(first, last)
+            )
+        return totals[root]
+
+    def get_bag_count(self, possible_content_bag: str) -> int:
+        """`day7.get_bag_count`: how many bags can eventually hold this one."""
+        reverse_offsets, sources = self.reverse_offsets, self.sources
+        root = self.colour_id(possible_content_bag)
+        seen = {root}
+        stack = [root]
+        containers = 0
+        while stack:
+            node = stack.pop()
+            for edge in range(reverse_offsets[node], reverse_offsets[node + 1]):
+                source = sources[edge]
+                if source not in seen:
+                    seen.add(source)
+                    containers += 1
+                    stack.append(source)
+        return containers
+
+    def close(self):
+        """Detach; the owner also frees the block."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "SharedRuleGraph":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+# ***** Worker processes *****
+
+_graph: t.Optional[SharedRuleGraph] = None
+
+
+def attach_worker(name: str):
+    """Pool initializer: attach this worker to a published graph."""
+    global _graph  # pylint: disable=global-statement
+    _graph = SharedRuleGraph.attach(name)
+
+
+def worker_query(query: t.Tuple[str, str]) -> int:
+    """Answer ("contains", colour) or ("contents", colour) in a worker."""
+    if _graph is None:
+        raise RuntimeError("worker not attached; use attach_worker")
+    kind, colour = query
+    if kind == "contains":
+        return _graph.get_bag_count(colour)
+    if kind == "contents":
+        return _graph.get_content_bag_count(colour)
+    raise ValueError(f"unknown query {kind!r}")
+
+
+def publish_text(data: str) -> SharedRuleGraph:
+    return SharedRuleGraph.publish(_parse_lines(data.split("\n")))
+
+
+def _solve(query: t.Callable[[SharedRuleGraph], int]):
+    def _with_graph(graph: SharedRuleGraph) -> int:
+        with graph:
+            return query(graph)
+
+    return _with_graph
+
+
+register(day=7, part=1, parse=publish_text, engine="shared")(
+    _solve(lambda graph: graph.get_bag_count("shiny gold"))
+)
+register(day=7, part=2, parse=publish_text, engine="shared")(
+    _solve(lambda graph: graph.get_content_bag_count("shiny gold"))
+)
+
+
+if __name__ == "__main__":
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+
+    from day7_parallel import parse_file_parallel
+
+    PATH = sys.argv[1] if len(sys.argv) > 1 else "data/day7.txt"
+    with SharedRuleGraph.publish(parse_file_parallel(PATH)) as GRAPH:
+        print(
+            f"published {GRAPH.size} colours, {GRAPH.edges} edges "
+            f"as {GRAPH.name}"
+        )
+        QUERIES = [("contains", "shiny gold"), ("contents", "shiny gold")]
+        with ProcessPoolExecutor(
+            4, initializer=attach_worker, initargs=(GRAPH.name,)
+        ) as POOL:
+            ANSWERS = POOL.map(worker_query, QUERIES)
+            for (KIND, COLOUR), ANSWER in zip(QUERIES, ANSWERS):
+                print(f"{KIND} {COLOUR}: {ANSWER}")
@@ -1,9 +1,13 @@
 """Solution for Day 8. (part 2)"""
 import re
+import time
 import typing as t
-from dataclasses import dataclass
+from collections import Counter, deque
+from dataclasses import dataclass, field
 
-from utils.parse import parse_to_lines
+from utils.instrument import instrument
+from utils.parse import get_lines, parse_to_lines
+from utils.solvers import register
 
 
 class LoopDetectedError(Exception):
@@ -14,6 +18,10 @@ class RemediationError(Exception):
     pass
 
 
+class JumpOutOfRangeError(IndexError):
+    """A jump before the first instruction, which `Program.run` can't index."""
+
+
 def parse_instruction(line: str) -> t.Tuple[str, int]:
     """Parse an instruction form a line of data"""
     groups = re.search(r"^([a-z]{3})\s([+-]\d+)$", line)
@@ -29,6 +37,300 @@ def dump_instruction(inst: t.Tuple[str, int]) -> str:
     return f"{action} {sign}{count}"
 
 
+# ***** Decoded engine *****
+
+ACTIONS = ("nop", "acc", "jmp")
+NOP, ACC, JMP = range(len(ACTIONS))
+
+Instruction = t.Tuple[int, int]
+DecodedProgram = t.Tuple[Instruction, ...]
+
+
+def decode_instruction(line: str) -> Instruction:
+    """'jmp -3' -> (JMP, -3)"""
+    action, amount = parse_instruction(line)
+    if action not in ACTIONS:
+        raise ValueError(f"unknown action {action}")
+    return (ACTIONS.index(action), amount)
+
+
+def encode_instruction(inst: Instruction) -> str:
+    """(JMP, -3) -> 'jmp -3'"""
+    opcode, amount = inst
+    return dump_instruction((ACTIONS[opcode], amount))
+
+
+def decode_program(instructions: t.Tuple[str, ...]) -> DecodedProgram:
+    """Parse every line once so the engine never touches text while running."""
+    return tuple(map(decode_instruction, instructions))
+
+
+def parse_program(data: str) -> DecodedProgram:
+    return decode_program(get_lines(data))
+
+
+@dataclass
+class ExecutionTracer:
+    """Optional instrumentation for `execute`.
+
+    One tracer can be shared across many runs (e.g. every remediation
+    candidate); counters accumulate and each run appends its wall time.
+    """
+
+    trace_length: int = 32
+    opcode_counts: t.List[int] = field(
+        default_factory=lambda: [0] * len(ACTIONS)
+    )
+    pc_hits: t.Counter[int] = field(default_factory=Counter)
+    run_times: t.List[float] = field(default_factory=list)
+    trace: t.Deque[t.Tuple[int, int, int]] = field(init=False)
+    _started: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        self.trace = deque(maxlen=self.trace_length)
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.run_times.append(time.perf_counter() - self._started)
+
+    def record(self, pc: int, opcode: int, acc: int):
+        """Record a step, before the instruction at `pc` is run."""
+        self.opcode_counts[opcode] += 1
+        self.pc_hits[pc] += 1
+        self.trace.append((pc, opcode, acc))
+
+    @property
+    def steps(self) -> int:
+        return sum(self.opcode_counts)
+
+    def opcode_histogram(self) -> t.Dict[str, int]:
+        return dict(zip(ACTIONS, self.opcode_counts))
+
+    def format_trace(self) -> str:
+        """Render the ring buffer, oldest step first."""
+        return "\n".join(
+            f"{pc:>6} {ACTIONS[opcode]} (acc {acc})"
+            for pc, opcode, acc in self.trace
+        )
+
+
+def execute(
+    program: DecodedProgram, tracer: t.Optional[ExecutionTracer] = None
+) -> int:
+    """Run a decoded program and return the accumulator once it terminates.
+
+    Iterative counterpart of `Program.run` (without remediation). The tracer
+    hooks sit on the same loop, so an instrumented run exercises exactly the
+    code that an uninstrumented one does; disabled, they cost a None check.
+    """
+    size = len(program)
+    seen = bytearray(size)
+    pc = 0
+    acc = 0
+
+    if tracer is not None:
+        tracer.start()
+    try:
+        while pc < size:
+            if seen[pc]:
+                raise LoopDetectedError(
+                    "Loop detected, terminating before re-entry. index: "
+                    f"{pc}, accum: {acc}"
+                )
+            seen[pc] = 1
+            opcode, amount = program[pc]
+            if tracer is not None:
+                tracer.record(pc, opcode, acc)
+
+            if opcode == ACC:
+                acc += amount
+                pc += 1
+            elif opcode == JMP:
+                pc += amount
+                if pc < 0:
+                    raise JumpOutOfRangeError(
+                        "Jump before start of program. "
+                        f"index: {pc}, accum: {acc}"
+                    )
+            else:
+                pc += 1
+    finally:
+        if tracer is not None:
+            tracer.stop()
+
+    return acc
+
+
+def run_until_loop(
+    program: DecodedProgram,
+) -> t.Tuple[t.List[int], t.Optional[int]]:
+    """Return the pcs visited in order, and the pc that would be re-entered.
+
+    The second value is None if the program terminates instead of looping.
+    """
+    size = len(program)
+    seen = bytearray(size)
+    trail = []
+    pc = 0
+    while pc < size:
+        if seen[pc]:
+            return (trail, pc)
+        seen[pc] = 1
+        trail.append(pc)
+        opcode, amount = program[pc]
+        pc += amount if opcode == JMP else 1
+        if pc < 0:
+            raise JumpOutOfRangeError(
+                f"Jump before start of program. index: {pc}"
+            )
+    return (trail, None)
+
+
+def flip_instruction(inst: Instruction) -> Instruction:
+    opcode, amount = inst
+    flipped = {NOP: JMP, JMP: NOP}
+    return (flipped[opcode], amount)
+
+
+def with_flip(program: DecodedProgram, pc: int) -> DecodedProgram:
+    """Copy of `program` with the nop/jmp at `pc` flipped."""
+    return program[:pc] + (flip_instruction(program[pc]),) + program[pc + 1 :]
+
+
+def loop_candidates(program: DecodedProgram) -> t.Tuple[int, ...]:
+    """The nop/jmp pcs inside the loop, in the order the loop visits them.
+
+    This is the order `Program._attempt_remediation` tries them in.
+    """
+    trail, loop_pc = run_until_loop(program)
+    if loop_pc is None:
+        return ()
+    loop_cycle = trail[trail.index(loop_pc) :]
+    return tuple(filter(lambda i: program[i][0] in (NOP, JMP), loop_cycle))
+
+
+@register(day=8, part=2, parse=parse_program, engine="decoded")
+def remediate(
+    program: DecodedProgram, tracer: t.Optional[ExecutionTracer] = None
+) -> int:
+    """Decoded counterpart of `Program.run(remediation_mode=True)`.
+
+    A tracer, if given, records the original run and every repair attempt.
+    """
+    try:
+        return execute(program, tracer)
+    except LoopDetectedError:
+        pass
+
+    for pc in loop_candidates(program):
+        try:
+            return execute(with_flip(program, pc), tracer)
+        except (LoopDetectedError, JumpOutOfRangeError):
+            pass
+
+    raise RemediationError("Failed to remediate.")
+
+
+# ***** Prefix snapshots *****
+
+
+@dataclass
+class RunRecord:
+    """Checkpoints of one run of a program, one per step.
+
+    Step n ran the instruction at `trail[n]` with `accs[n]` in the accumulator
+    beforehand. `first_step[pc]` is the step at which pc ran (-1 if it never
+    did), which doubles as every checkpoint's visited set: at step n, exactly
+    the pcs with 0 <= first_step[pc] < n have been visited. Nothing is copied
+    per checkpoint; a resumed run keeps its own visits in a small overlay.
+    """
+
+    trail: t.List[int]
+    accs: t.List[int]
+    first_step: t.List[int]
+    loop_pc: t.Optional[int]
+    final_acc: int
+
+    @classmethod
+    def record(cls, program: DecodedProgram) -> "RunRecord":
+        size = len(program)
+        first_step = [-1] * size
+        trail: t.List[int] = []
+        accs: t.List[int] = []
+        pc = acc = 0
+        while pc < size:
+            if first_step[pc] >= 0:
+                return cls(trail, accs, first_step, pc, acc)
+            first_step[pc] = len(trail)
+            trail.append(pc)
+            accs.append(acc)
+            opcode, amount = program[pc]
+            if opcode == ACC:
+                acc += amount
+            pc += amount if opcode == JMP else 1
+            if pc < 0:
+                raise JumpOutOfRangeError(
+                    f"Jump before start of program. index: {pc}, accum: {acc}"
+                )
+        return cls(trail, accs, first_step, None, acc)
+
+    def resume_flipped(
+        self, program: DecodedProgram, pc: int
+    ) -> t.Optional[int]:
+        """Re-run from just before `pc` first ran, with its nop/jmp flipped.
+
+        Returns the accumulator if that run terminates, None if it loops.
+        Jumping before the start raises JumpOutOfRangeError, as `execute` does.
+        """
+        step = self.first_step[pc]
+        first_step = self.first_step
+        size = len(program)
+        overlay = set()
+        acc = self.accs[step]
+        opcode, amount = flip_instruction(program[pc])
+        while True:
+            overlay.add(pc)
+            if opcode == ACC:
+                acc += amount
+            pc += amount if opcode == JMP else 1
+            if pc >= size:
+                return acc
+            if pc < 0:
+                raise JumpOutOfRangeError(
+                    f"Jump before start of program. index: {pc}, accum: {acc}"
+                )
+            if 0 <= first_step[pc] < step or pc in overlay:
+                return None
+            opcode, amount = program[pc]
+
+
+@register(day=8, part=2, parse=parse_program, engine="snapshots")
+def remediate_from_snapshots(program: DecodedProgram) -> int:
+    """`remediate`, resuming each candidate from the original run's checkpoints.
+
+    The path up to a flipped instruction is the same as the original run's,
+    so only the divergent suffix of each candidate is executed.
+    """
+    record = RunRecord.record(program)
+    if record.loop_pc is None:
+        return record.final_acc
+
+    loop_cycle = record.trail[record.first_step[record.loop_pc] :]
+    for pc in loop_cycle:
+        if program[pc][0] not in (NOP, JMP):
+            continue
+        try:
+            acc = record.resume_flipped(program, pc)
+        except JumpOutOfRangeError:
+            continue
+        if acc is not None:
+            return acc
+
+    raise RemediationError("Failed to remediate.")
+
+
 @dataclass
 class ProgramState:
     cur_amount: int
@@ -60,6 +362,11 @@ class ProgramState:
         elif action == "jmp":
             next_amount = self.cur_amount
             next_index = self.cur_index + amount
+            if next_index < 0:
+                raise JumpOutOfRangeError(
+                    "Jump before start of program. index: "
+                    f"{next_index}, accum: {next_amount}"
+                )
         elif action == "nop":
             next_amount = self.cur_amount
             next_index = self.cur_index + 1
@@ -139,19 +446,25 @@ class Program:
                 # We want this to error out if it finds a loop again
                 return pgrm_repaired.run(remediation_mode=False)
 
-            except LoopDetectedError:
+            except (LoopDetectedError, JumpOutOfRangeError):
                 pass
 
         raise RemediationError("Failed to remediate.")
 
         return self.accum
 
+    @instrument()
     def run(self, remediation_mode=False) -> int:
         """Run through the program and return the accumulator at the final state.
 
         If run in remediation_mode, attempt to repair the program in the event a
         loop is detected and return the result of the repaired program's run.
         """
+        # The recursion goes through `_run`, so instrumentation adds no frames
+        # to it.
+        return self._run(remediation_mode)
+
+    def _run(self, remediation_mode: bool) -> int:
         if self.pointer in self.indexes_seen:
             if remediation_mode:
                 print(
@@ -170,7 +483,17 @@ class Program:
 
         self.log_index()
         self.state = self.state.get_next()
-        return self.run(remediation_mode)
+        return self._run(remediation_mode)
+
+
+@register(
+    day=8,
+    part=2,
+    parse=lambda data: Program.from_instructions(get_lines(data)),
+    default_input="data/day8.txt",
+)
+def run_with_remediation(program: Program) -> int:
+    return program.run(remediation_mode=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""Binary bytecode for decoded day 8 programs.
+
+Layout (little endian):
+    header: magic b"AOC8", version (u8), record count (u32)
+    records: opcode (u8), operand (i32), packed back to back
+"""
+import mmap
+import struct
+import sys
+import typing as t
+from pathlib import Path
+
+from day8 import (
+    ACTIONS,
+    DecodedProgram,
+    decode_program,
+    encode_instruction,
+    parse_instruction,
+)
+from utils.parse import parse_to_lines
+
+MAGIC = b"AOC8"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+RECORD = struct.Struct("<Bi")
+
+
+def pack_program(program: DecodedProgram) -> bytes:
+    """Serialise a decoded program to bytecode."""
+    records = b"".join(
+        RECORD.pack(opcode, amount) for opcode, amount in program
+    )
+    return HEADER.pack(MAGIC, VERSION, len(program)) + records
+
+
+def unpack_program(
+    buffer: t.Union[bytes, memoryview, mmap.mmap],
+) -> DecodedProgram:
+    """Deserialise bytecode produced by `pack_program`."""
+    if len(buffer) < HEADER.size:
+        raise ValueError("truncated bytecode: no header")
+    magic, version, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"not a day 8 bytecode file (magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"unsupported bytecode version {version}")
+
+    end = HEADER.size + count * RECORD.size
+    if len(buffer) < end:
+        raise ValueError(f"truncated bytecode: expected {count} records")
+
+    with memoryview(buffer) as view:
+        program = tuple(RECORD.iter_unpack(view[HEADER.size : end]))
+
+    for opcode, _ in program:
+        if opcode >= len(ACTIONS):
+            raise ValueError(f"unknown opcode {opcode}")
+    return program
+
+
+def write_bytecode(relative_path: str, program: DecodedProgram):
+    Path(relative_path).write_bytes(pack_program(program))
+
+
+def load_bytecode(relative_path: str) -> DecodedProgram:
+    """Memory-map a bytecode file and decode it without touching any text."""
+    with open(relative_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return unpack_program(mapped)
+
+
+def compile_file(source_path: str, bytecode_path: str) -> DecodedProgram:
+    """Parse a source file once and write its bytecode alongside.
+
+    Raises ValueError, before writing anything, if the bytecode wouldn't
+    reproduce the source, and again if the written file doesn't load back.
+    """
+    instructions = parse_to_lines(source_path)
+    check_round_trip(instructions)
+    program = decode_program(instructions)
+    write_bytecode(bytecode_path, program)
+    if load_bytecode(bytecode_path) != program:
+        raise ValueError(f"{bytecode_path} doesn't load back as {source_path}")
+    return program
+
+
+def check_round_trip(instructions: t.Tuple[str, ...]):
+    """Raise ValueError unless source -> bytecode -> source is lossless."""
+    program = decode_program(instructions)
+    try:
+        restored = unpack_program(pack_program(program))
+    except struct.error as e:
+        raise ValueError(f"program can't be stored as bytecode: {e}") from e
+    if restored != program:
+        raise ValueError("bytecode doesn't decode back to the same program")
+
+    for index, (line, inst) in enumerate(zip(instructions, restored)):
+        restored_line = encode_instruction(inst)
+        if parse_instruction(restored_line) != parse_instruction(line):
+            raise ValueError(
+                f"instruction {index} ({line!r}) doesn't round-trip"
+            )
+
+
+if __name__ == "__main__":
+    # python day8_bytecode.py data/day8.txt data/day8.bc
+    SOURCE, TARGET = sys.argv[1:3]
+    compiled = compile_file(SOURCE, TARGET)
+    print(f"wrote {len(compiled)} instructions to {TARGET}")
@@ -0,0 +1,206 @@
+"""Compile decoded day 8 programs into Python functions.
+
+A program is split into basic blocks: straight runs of instructions entered
+only at their first pc. Every block then boils down to one constant acc
+increment and one successor, so the generated function does a single
+addition per block instead of dispatching every instruction. Blocks are
+labelled and selected through a balanced if-tree on the block number.
+
+Every nop and jmp ends a block, and the generated function takes the pc of
+one of them to flip. Each such block picks its successor by comparing
+`flip` with its last pc, so one compiled function runs the program and every
+repair attempt. Functions are cached by program, keyed on the decoded tuple
+itself.
+"""
+import typing as t
+from collections import OrderedDict
+
+from day8 import (
+    ACC,
+    JMP,
+    NOP,
+    DecodedProgram,
+    JumpOutOfRangeError,
+    LoopDetectedError,
+    RemediationError,
+    loop_candidates,
+    parse_program,
+)
+from utils.solvers import register
+
+# Takes the pc of the nop/jmp to flip, or NO_FLIP.
+CompiledProgram = t.Callable[[int], int]
+
+NO_FLIP = -1
+MAX_CACHED = 256
+_cache: "OrderedDict[DecodedProgram, CompiledProgram]" = OrderedDict()
+
+# Successors that aren't blocks.
+TERMINATE = -1
+OUT_OF_BOUNDS = -2
+# (successor block or one of the above, target pc)
+Successor = t.Tuple[int, int]
+
+
+def _targets(pc: int, opcode: int, amount: int) -> t.Tuple[int, int]:
+    """Next pc of the instruction as written, and with it flipped."""
+    if opcode == JMP:
+        return (pc + amount, pc + 1)
+    if opcode == NOP:
+        return (pc + 1, pc + amount)
+    return (pc + 1, pc + 1)
+
+
+def find_blocks(program: DecodedProgram) -> t.List[t.Tuple[int, int]]:
+    """(first pc, last pc) of every basic block, in program order.
+
+    Blocks hold whether or not any one nop/jmp is flipped.
+    """
+    size = len(program)
+    leaders = {0} if size else set()
+    for pc, (opcode, amount) in enumerate(program):
+        if opcode != ACC:
+            leaders.update(
+                target
+                for target in _targets(pc, opcode, amount)
+                if 0 <= target < size
+            )
+
+    starts = sorted(leaders)
+    return [(start, end - 1) for start, end in zip(starts, starts[1:] + [size])]
+
+
+def _summarise(
+    program: DecodedProgram, blocks: t.List[t.Tuple[int, int]]
+) -> t.List[t.Tuple[int, Successor, Successor]]:
+    """Fold each block to (acc delta, successor, flipped successor)."""
+    block_at = {start: number for number, (start, _) in enumerate(blocks)}
+    size = len(program)
+
+    def _successor(target: int) -> Successor:
+        if target >= size:
+            return (TERMINATE, target)
+        if target < 0:
+            return (OUT_OF_BOUNDS, target)
+        return (block_at[target], target)
+
+    summaries = []
+    for start, end in blocks:
+        body = program[start : end + 1]
+        delta = sum(amount for opcode, amount in body if opcode == ACC)
+        target, flipped = _targets(end, *program[end])
+        summaries.append((delta, _successor(target), _successor(flipped)))
+    return summaries
+
+
+def _emit_successor(lines: t.List[str], indent: str, successor: Successor):
+    block, target = successor
+    if block == TERMINATE:
+        lines.append(f"{indent}return acc")
+    elif block == OUT_OF_BOUNDS:
+        # The same message as `day8.execute`, naming the target pc.
+        lines.append(
+            f'{indent}raise JumpOutOfRangeError(f"Jump before start of '
+            f'program. index: {target}, accum: {{acc}}")'
+        )
+    else:
+        lines.append(f"{indent}block = {block}")
+
+
+def _emit_block(
+    lines: t.List[str],
+    indent: str,
+    number: int,
+    pcs: t.Tuple[int, int],
+    summary: t.Tuple[int, Successor, Successor],
+):
+    start, end = pcs
+    delta, successor, flipped = summary
+    lines.append(f"{indent}# block {number}: pcs {start}-{end}")
+    lines.append(f"{indent}if seen[{number}]:")
+    lines.append(
+        f'{indent}    raise LoopDetectedError(f"Loop detected, terminating '
+        f'before re-entry. index: {start}, accum: {{acc}}")'
+    )
+    lines.append(f"{indent}seen[{number}] = 1")
+    if delta:
+        lines.append(f"{indent}acc += {delta}")
+    if flipped == successor:
+        _emit_successor(lines, indent, successor)
+        return
+    lines.append(f"{indent}if flip == {end}:")
+    _emit_successor(lines, indent + "    ", flipped)
+    lines.append(f"{indent}else:")
+    _emit_successor(lines, indent + "    ", successor)
+
+
+def generate_source(program: DecodedProgram, name: str = "run_program") -> str:
+    """Python source for a function that runs `program` and returns acc."""
+    blocks = find_blocks(program)
+    summaries = _summarise(program, blocks)
+    lines = [
+        f"def {name}(flip={NO_FLIP}):",
+        f"    seen = bytearray({len(blocks)})",
+        "    acc = 0",
+    ]
+    if not blocks:
+        lines.append("    return acc")
+        return "\n".join(lines) + "\n"
+
+    lines += ["    block = 0", "    while True:"]
+
+    def _tree(low: int, high: int, indent: str):
+        if high - low == 1:
+            _emit_block(lines, indent, low, blocks[low], summaries[low])
+            return
+        middle = (low + high) // 2
+        lines.append(f"{indent}if block < {middle}:")
+        _tree(low, middle, indent + "    ")
+        lines.append(f"{indent}else:")
+        _tree(middle, high, indent + "    ")
+
+    _tree(0, len(blocks), " " * 8)
+    return "\n".join(lines) + "\n"
+
+
+def compile_program(program: DecodedProgram) -> CompiledProgram:
+    """Compile (or fetch from the cache) a function that runs `program`."""
+    compiled = _cache.get(program)
+    if compiled is not None:
+        _cache.move_to_end(program)
+        return compiled
+
+    namespace: t.Dict[str, t.Any] = {
+        "JumpOutOfRangeError": JumpOutOfRangeError,
+        "LoopDetectedError": LoopDetectedError,
+    }
+    code = compile(generate_source(program), "<day8 program>", "exec")
+    exec(code, namespace)  # pylint: disable=exec-used
+    compiled = namespace["run_program"]
+
+    _cache[program] = compiled
+    while len(_cache) > MAX_CACHED:
+        _cache.popitem(last=False)
+    return compiled
+
+
+def clear_cache():
+    _cache.clear()
+
+
+@register(day=8, part=2, parse=parse_program, engine="compiled")
+def remediate_compiled(program: DecodedProgram) -> int:
+    """`day8.remediate`, running the program and each flip compiled once."""
+    compiled = compile_program(program)
+    try:
+        return compiled(NO_FLIP)
+    except LoopDetectedError:
+        pass
+
+    for pc in loop_candidates(program):
+        try:
+            return compiled(pc)
+        except (LoopDetectedError, JumpOutOfRangeError):
+            pass
+
+    raise RemediationError("Failed to remediate.")
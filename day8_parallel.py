@@ -0,0 +1,121 @@
+"""Concurrent evaluation of day 8 remediation candidates.
+
+The decoded program is published once, as bytecode, in a shared memory block
+that every worker attaches to; tasks only carry candidate pcs. The first 8
+bytes of the block hold the lowest candidate position known to succeed, so
+workers skip anything that can no longer win.
+"""
+import multiprocessing as mp
+import struct
+import typing as t
+from multiprocessing import shared_memory
+
+from day8 import (
+    DecodedProgram,
+    JumpOutOfRangeError,
+    LoopDetectedError,
+    RemediationError,
+    execute,
+    loop_candidates,
+    parse_program,
+    with_flip,
+)
+from day8_bytecode import pack_program, unpack_program
+from utils.solvers import register
+
+BEST = struct.Struct("<q")
+NO_BEST = 2**62
+
+# Per-worker state, set up once by `_init_worker`.
+_worker: t.Dict[str, t.Any] = {}
+
+
+def _init_worker(shm_name: str, lock):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    program_view = shm.buf[BEST.size :]
+    _worker["program"] = unpack_program(program_view)
+    program_view.release()
+    _worker["shm"] = shm
+    _worker["lock"] = lock
+
+
+def _best_so_far() -> int:
+    return BEST.unpack_from(_worker["shm"].buf, 0)[0]
+
+
+def _claim(position: int):
+    with _worker["lock"]:
+        if position < _best_so_far():
+            BEST.pack_into(_worker["shm"].buf, 0, position)
+
+
+def _evaluate_chunk(
+    chunk: t.Tuple[int, t.Tuple[int, ...]],
+) -> t.Optional[t.Tuple[int, int]]:
+    """Try a run of consecutive candidates; (position, accum) on success."""
+    start, pcs = chunk
+    program = _worker["program"]
+    for position, pc in enumerate(pcs, start):
+        if position > _best_so_far():
+            return None
+        try:
+            accum = execute(with_flip(program, pc))
+        except (LoopDetectedError, JumpOutOfRangeError):
+            continue
+        _claim(position)
+        return (position, accum)
+    return None
+
+
+def _chunks(
+    candidates: t.Tuple[int, ...], chunk_size: int
+) -> t.Iterator[t.Tuple[int, t.Tuple[int, ...]]]:
+    for start in range(0, len(candidates), chunk_size):
+        yield (start, candidates[start : start + chunk_size])
+
+
+@register(day=8, part=2, parse=parse_program, engine="parallel")
+def remediate_parallel(
+    program: DecodedProgram,
+    processes: t.Optional[int] = None,
+    chunk_size: int = 16,
+) -> int:
+    """Parallel counterpart of `day8.remediate`.
+
+    Chunks are consumed in candidate order, so the first successful chunk
+    holds the lowest successful position - the flip the sequential search
+    would have found. Remaining workers are terminated at that point.
+    """
+    try:
+        return execute(program)
+    except LoopDetectedError:
+        pass
+
+    candidates = loop_candidates(program)
+    bytecode = pack_program(program)
+    shm = shared_memory.SharedMemory(
+        create=True, size=BEST.size + len(bytecode)
+    )
+    try:
+        BEST.pack_into(shm.buf, 0, NO_BEST)
+        shm.buf[BEST.size : BEST.size + len(bytecode)] = bytecode
+
+        lock = mp.Lock()
+        with mp.Pool(processes, _init_worker, (shm.name, lock)) as pool:
+            for result in pool.imap(
+                _evaluate_chunk, _chunks(candidates, chunk_size)
+            ):
+                if result is not None:
+                    pool.terminate()
+                    return result[1]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    raise RemediationError("Failed to remediate.")
+
+
+if __name__ == "__main__":
+    from utils.parse import parse_file
+
+    print(remediate_parallel(parse_program(parse_file("data/day8.txt"))))
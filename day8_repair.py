@@ -0,0 +1,138 @@
+"""Repair day 8 programs that need more than one nop/jmp flipped.
+
+The search runs over (pc, flips used) states rather than over sets of flips:
+at a nop/jmp the program either follows the instruction or flips it, and at
+most `max_flips` flips are allowed. States are explored cheapest first by
+(flips, steps), so the first exit reached is a fix with the fewest flips
+(and, among those, the shortest run), after at most n * (max_flips + 1)
+states.
+
+A state whose pc already terminates unmodified goes straight to the exit
+without being expanded, and one that has no flips left and doesn't terminate
+is dropped. The flips found are replayed with `day8.execute` to get the
+accumulator.
+
+This is not a part 2 engine: `day8.remediate` takes the first single flip,
+in loop order, that terminates, which need not be the one with the shortest
+run, so the answers can differ.
+"""
+import heapq
+import typing as t
+from dataclasses import dataclass
+
+from day8 import (
+    JMP,
+    NOP,
+    DecodedProgram,
+    RemediationError,
+    execute,
+    parse_program,
+    with_flip,
+)
+
+State = t.Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Repair:
+    flips: t.Tuple[int, ...]
+    acc: int
+    steps: int
+
+
+def steps_to_exit(program: DecodedProgram) -> t.List[int]:
+    """Steps the unmodified program takes from each pc to terminate.
+
+    -1 where it never does (it loops, or jumps before the start).
+    """
+    size = len(program)
+    entered_from: t.List[t.List[int]] = [[] for _ in range(size)]
+    remaining = [-1] * size
+    stack = []
+    for pc, (opcode, amount) in enumerate(program):
+        target = pc + amount if opcode == JMP else pc + 1
+        if target >= size:
+            remaining[pc] = 1
+            stack.append(pc)
+        elif target >= 0:
+            entered_from[target].append(pc)
+
+    while stack:
+        pc = stack.pop()
+        for previous in entered_from[pc]:
+            remaining[previous] = remaining[pc] + 1
+            stack.append(previous)
+    return remaining
+
+
+def find_repair(program: DecodedProgram, max_flips: int = 3) -> Repair:
+    """The fewest nop/jmp flips (at most `max_flips`) that make `program` exit.
+
+    Raises RemediationError if there's no such fix.
+    """
+    size = len(program)
+    remaining = steps_to_exit(program)
+    best: t.Dict[State, int] = {(0, 0): 0}
+    came_from: t.Dict[State, t.Optional[State]] = {(0, 0): None}
+    heap = [(0, 0, 0)]
+
+    def _push(state: State, steps: int, previous: State):
+        if steps < best.get(state, steps + 1):
+            best[state] = steps
+            came_from[state] = previous
+            heapq.heappush(heap, (state[1], steps, state[0]))
+
+    while heap:
+        flips, steps, pc = heapq.heappop(heap)
+        if steps > best[(pc, flips)]:
+            continue
+        if pc >= size:
+            return _replay(program, _flipped_pcs((pc, flips), came_from), steps)
+        if remaining[pc] >= 0:
+            _push((size, flips), steps + remaining[pc], (pc, flips))
+            continue
+        if flips == max_flips:
+            continue
+
+        opcode, amount = program[pc]
+        follow = pc + amount if opcode == JMP else pc + 1
+        if follow >= 0:
+            _push((min(follow, size), flips), steps + 1, (pc, flips))
+        if opcode in (NOP, JMP):
+            flipped = pc + 1 if opcode == JMP else pc + amount
+            if flipped >= 0:
+                _push((min(flipped, size), flips + 1), steps + 1, (pc, flips))
+
+    raise RemediationError(f"Failed to remediate within {max_flips} flips.")
+
+
+def _flipped_pcs(
+    state: State, came_from: t.Dict[State, t.Optional[State]]
+) -> t.Tuple[int, ...]:
+    flips = []
+    previous = came_from[state]
+    while previous is not None:
+        if previous[1] != state[1]:
+            flips.append(previous[0])
+        state, previous = previous, came_from[previous]
+    return tuple(sorted(flips))
+
+
+def _replay(
+    program: DecodedProgram, flips: t.Tuple[int, ...], steps: int
+) -> Repair:
+    for pc in flips:
+        program = with_flip(program, pc)
+    return Repair(flips, execute(program), steps)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from utils.parse import parse_file
+
+    PATH = sys.argv[1] if len(sys.argv) > 1 else "data/day8.txt"
+    MAX_FLIPS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    REPAIR = find_repair(parse_program(parse_file(PATH)), MAX_FLIPS)
+    print(REPAIR.acc)
+    print(f"flipped {list(REPAIR.flips)}, {REPAIR.steps} steps")
@@ -0,0 +1,243 @@
+"""Run many day 8 programs in one process, round-robin, in fixed step quanta.
+
+Each program gets its own `VirtualMachine`, which can be paused between any
+two instructions. The scheduler runs the machine at the head of its ready
+queue for at most `quantum` steps, puts it back at the tail if it hasn't
+finished, and yields to the event loop after every quantum. A runaway program
+therefore only ever holds up the others for one quantum, and is stopped once
+it uses up its step or time budget.
+
+    scheduler = Scheduler(quantum=1000, max_steps=100_000)
+    acc = await scheduler.spawn(program).run()
+"""
+import asyncio
+import time
+import typing as t
+from collections import deque
+
+from day8 import (
+    ACC,
+    JMP,
+    DecodedProgram,
+    JumpOutOfRangeError,
+    LoopDetectedError,
+    parse_program,
+)
+
+
+class BudgetExceededError(Exception):
+    pass
+
+
+class VirtualMachine:
+    """A paused-between-quanta run of one decoded program."""
+
+    def __init__(
+        self,
+        scheduler: "Scheduler",
+        program: DecodedProgram,
+        max_steps: t.Optional[int] = None,
+        max_seconds: t.Optional[float] = None,
+    ):
+        self.scheduler = scheduler
+        self.program = program
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.pc = 0
+        self.acc = 0
+        self.steps = 0
+        self.seconds = 0.0
+        self._seen = bytearray(len(program))
+        self._result: t.Optional[asyncio.Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._result is not None and self._result.done()
+
+    def _advance(self, quantum: int) -> bool:
+        """Run up to `quantum` steps. True once the program has terminated."""
+        if self.max_steps is not None:
+            quantum = min(quantum, self.max_steps - self.steps)
+        program = self.program
+        size = len(program)
+        seen = self._seen
+        pc = self.pc
+        acc = self.acc
+        steps = 0
+        try:
+            while pc < size:
+                if steps == quantum:
+                    break
+                if seen[pc]:
+                    raise LoopDetectedError(
+                        "Loop detected, terminating before re-entry. index: "
+                        f"{pc}, accum: {acc}"
+                    )
+                seen[pc] = 1
+                opcode, amount = program[pc]
+                if opcode == ACC:
+                    acc += amount
+                    pc += 1
+                elif opcode == JMP:
+                    pc += amount
+                    if pc < 0:
+                        raise JumpOutOfRangeError(
+                            "Jump before start of program. index: "
+                            f"{pc}, accum: {acc}"
+                        )
+                else:
+                    pc += 1
+                steps += 1
+        finally:
+            self.pc = pc
+            self.acc = acc
+            self.steps += steps
+
+        if pc >= size:
+            return True
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            raise BudgetExceededError(
+                f"Step budget of {self.max_steps} used up at index: {pc}"
+            )
+        return False
+
+    async def run(self) -> int:
+        """Wait for the program to terminate and return the accumulator.
+
+        Raises LoopDetectedError, JumpOutOfRangeError or BudgetExceededError
+        if it doesn't. Cancelling the wait takes the machine off the scheduler.
+        """
+        if self._result is None:
+            self._result = self.scheduler._admit(self)
+        return await self._result
+
+
+class Scheduler:
+    """Round-robin runner for many `VirtualMachine`s.
+
+    `max_steps` and `max_seconds` are the default budgets for each machine.
+    Time is only charged while a machine is actually running.
+    """
+
+    def __init__(
+        self,
+        quantum: int = 1000,
+        max_steps: t.Optional[int] = None,
+        max_seconds: t.Optional[float] = None,
+    ):
+        if quantum < 1:
+            raise ValueError("quantum must be at least one step")
+        self.quantum = quantum
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self._ready: t.Deque[t.Tuple[VirtualMachine, asyncio.Future]] = deque()
+        self._runner: t.Optional[asyncio.Task] = None
+        self.steps = 0
+        self.busy_seconds = 0.0
+        self.completed = 0
+        self.failed = 0
+
+    def spawn(
+        self,
+        program: DecodedProgram,
+        max_steps: t.Optional[int] = None,
+        max_seconds: t.Optional[float] = None,
+    ) -> VirtualMachine:
+        """A machine for `program`. It starts running once awaited."""
+        return VirtualMachine(
+            self,
+            program,
+            self.max_steps if max_steps is None else max_steps,
+            self.max_seconds if max_seconds is None else max_seconds,
+        )
+
+    def _admit(self, vm: VirtualMachine) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self._ready.append((vm, result))
+        if self._runner is None or self._runner.done():
+            self._runner = loop.create_task(self._run_ready())
+        return result
+
+    async def _run_ready(self):
+        clock = time.perf_counter
+        while self._ready:
+            vm, result = self._ready.popleft()
+            if result.done():
+                continue
+
+            before = vm.steps
+            start = clock()
+            try:
+                terminated = vm._advance(self.quantum)
+                if not terminated and vm.max_seconds is not None:
+                    if vm.seconds + clock() - start >= vm.max_seconds:
+                        raise BudgetExceededError(
+                            f"Time budget of {vm.max_seconds}s used up at "
+                            f"index: {vm.pc}"
+                        )
+            except Exception as error:  # pylint: disable=broad-except
+                # Whatever stops one machine must not stop the runner, or
+                # every other machine would wait forever.
+                result.set_exception(error)
+                self.failed += 1
+            else:
+                if terminated:
+                    result.set_result(vm.acc)
+                    self.completed += 1
+                else:
+                    self._ready.append((vm, result))
+            finally:
+                elapsed = clock() - start
+                vm.seconds += elapsed
+                self.busy_seconds += elapsed
+                self.steps += vm.steps - before
+
+            await asyncio.sleep(0)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._ready)
+
+    @property
+    def throughput(self) -> float:
+        """Steps per second across all machines, over time spent running."""
+        return self.steps / self.busy_seconds if self.busy_seconds else 0.0
+
+
+async def run_all(
+    scheduler: Scheduler, programs: t.Iterable[DecodedProgram]
+) -> t.List[t.Union[int, Exception]]:
+    """Run every program to completion; failures are returned, not raised."""
+    machines = [scheduler.spawn(program) for program in programs]
+    return await asyncio.gather(
+        *(vm.run() for vm in machines), return_exceptions=True
+    )
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+
+    from day8 import with_flip
+    from day8_repair import find_repair
+    from utils import synthetic
+
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    RNG = random.Random(8)
+    PROGRAMS = []
+    for _ in range(COUNT):
+        program = parse_program(synthetic.boot_program(RNG, 500))
+        if RNG.random() < 0.5:
+            program = with_flip(program, find_repair(program).flips[0])
+        PROGRAMS.append(program)
+
+    SCHEDULER = Scheduler(quantum=200, max_steps=1000)
+    WALL = time.perf_counter()
+    RESULTS = asyncio.run(run_all(SCHEDULER, PROGRAMS))
+    WALL = time.perf_counter() - WALL
+    print(
+        f"{SCHEDULER.completed} terminated, {SCHEDULER.failed} stopped, "
+        f"{SCHEDULER.steps} steps in {WALL:.3f}s "
+        f"({SCHEDULER.throughput:,.0f} steps/s running)"
+    )
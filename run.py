@@ -0,0 +1,215 @@
+"""Run any registered solver, timing parse and solve separately.
+
+    python run.py 8                      # every part, reference engine
+    python run.py 8 --part 2 --engine decoded --repeat 20
+    python run.py 7 --input data/day7_example.txt
+    gunzip -c archive/day6.txt.gz | python run.py 6 --input -
+    python run.py --list
+
+Answers are cached by solver and input content (see utils/cache.py). Timing
+and profiling runs and --refresh always solve; --no-cache skips the cache.
+
+    python run.py 7 --profile-json day7.json --profile-folded day7.folded
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import statistics
+import sys
+import typing as t
+
+from utils.cache import (
+    MISSING,
+    ResultCache,
+    digest_input,
+    digest_text,
+    result_key,
+)
+from utils import instrument
+from utils.parse import STDIN, parse_file
+from utils.solvers import (
+    REFERENCE,
+    SOLVERS,
+    Solver,
+    discover,
+    get_solver,
+    time_solver,
+)
+
+
+def default_input(solver: Solver) -> str:
+    """A solver's own default input, else the one registered for its day."""
+    if solver.default_input is not None:
+        return solver.default_input
+    for other in SOLVERS.values():
+        if other.day == solver.day and other.default_input is not None:
+            return other.default_input
+    raise ValueError(f"no default input for day {solver.day}; pass --input")
+
+
+def describe(solver: Solver, path: str) -> str:
+    return f"day {solver.day} part {solver.part} [{solver.engine}] {path}"
+
+
+def format_seconds(samples: t.Sequence[float]) -> str:
+    if len(samples) == 1:
+        return f"{samples[0] * 1000:.3f}ms"
+    return (
+        f"min {min(samples) * 1000:.3f}ms"
+        f" median {statistics.median(samples) * 1000:.3f}ms"
+        f" mean {statistics.mean(samples) * 1000:.3f}ms"
+        f" stdev {statistics.stdev(samples) * 1000:.3f}ms"
+    )
+
+
+def run_solver(
+    solver: Solver, path: str, data: str, repeat: int, quiet: bool
+) -> t.Any:
+    """Solve `repeat` times and print the answer with parse/solve timings.
+
+    The input is read once; parsing is repeated because some solvers consume
+    their parsed input (day 8's `Program` is stateful).
+    """
+    timings = []
+    for _ in range(repeat):
+        output = io.StringIO() if quiet else sys.stdout
+        with contextlib.redirect_stdout(output):
+            timings.append(time_solver(solver, data))
+
+    answer = timings[-1].answer
+    print(f"{describe(solver, path)}: {answer}")
+    print(f"  parse: {format_seconds([x.parse_seconds for x in timings])}")
+    print(f"  solve: {format_seconds([x.solve_seconds for x in timings])}")
+    return answer
+
+
+def instrument_stages(solver: Solver) -> Solver:
+    """The solver with its parse and solve stages instrumented."""
+    label = f"day{solver.day}.part{solver.part}.{solver.engine}"
+    return dataclasses.replace(
+        solver,
+        parse=instrument.instrument(f"{label}.parse")(solver.parse),
+        solve=instrument.instrument(f"{label}.solve")(solver.solve),
+    )
+
+
+def input_digest(path: str, inputs: t.Dict[str, str]) -> str:
+    """Hash stdin once it has been read; stream files through the hash."""
+    if path in inputs:
+        return digest_text(inputs[path])
+    if path == STDIN:
+        inputs[path] = parse_file(path)
+        return digest_text(inputs[path])
+    return digest_input(path)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("day", type=int, nargs="?")
+    parser.add_argument("--part", type=int, action="append")
+    parser.add_argument("--engine", default=REFERENCE)
+    parser.add_argument(
+        "--input",
+        help=(
+            "defaults to the day's file in data/; may be compressed, "
+            "or - for stdin"
+        ),
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--list", action="store_true", help="list solvers")
+    parser.add_argument(
+        "--verbose", action="store_true", help="show solvers' own output"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="don't read or write cached answers",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="solve and overwrite cached answers",
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="remove every cached answer"
+    )
+    parser.add_argument("--profile-json", help="write instrumentation stats")
+    parser.add_argument(
+        "--profile-folded", help="write collapsed stacks for a flamegraph"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="add peak memory to the --profile-json stats",
+    )
+    parser.add_argument("--cprofile", help="write cProfile stats")
+    args = parser.parse_args(argv)
+    profiling = bool(args.profile_json or args.profile_folded or args.cprofile)
+    if args.profile_memory and not args.profile_json:
+        parser.error("--profile-memory needs --profile-json to report to")
+
+    cache = None if args.no_cache else ResultCache()
+    if args.clear_cache:
+        print(f"removed {ResultCache().clear()} cached answers")
+        if args.day is None:
+            return 0
+
+    discover()
+    if args.list or args.day is None:
+        for day, part, engine in sorted(SOLVERS):
+            print(f"day {day} part {part}: {engine}")
+        return 0
+
+    parts = args.part or sorted({p for d, p, _ in SOLVERS if d == args.day})
+    if not parts:
+        parser.error(f"no solvers registered for day {args.day}")
+
+    if profiling:
+        instrument.enable(
+            memory=args.profile_memory, profile=bool(args.cprofile)
+        )
+
+    inputs: t.Dict[str, str] = {}
+    for part in parts:
+        try:
+            solver = get_solver(args.day, part, args.engine)
+            path = args.input or default_input(solver)
+        except ValueError as e:
+            parser.error(str(e))
+        if profiling:
+            solver = instrument_stages(solver)
+
+        if cache is not None:
+            key = result_key(solver, input_digest(path, inputs))
+            if not (args.refresh or profiling) and args.repeat <= 1:
+                answer = cache.get(key)
+                if answer is not MISSING:
+                    print(f"{describe(solver, path)}: {answer} (cached)")
+                    continue
+
+        if path not in inputs:
+            inputs[path] = parse_file(path)
+        answer = run_solver(
+            solver,
+            path,
+            inputs[path],
+            max(args.repeat, 1),
+            quiet=not args.verbose,
+        )
+        if cache is not None:
+            cache.put(key, solver, answer)
+
+    if profiling:
+        instrument.disable()
+        if args.profile_json:
+            instrument.write_json(args.profile_json)
+        if args.profile_folded:
+            instrument.write_collapsed(args.profile_folded)
+        if args.cprofile:
+            instrument.write_profile(args.cprofile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
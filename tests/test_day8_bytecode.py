@@ -0,0 +1,95 @@
+import pytest
+
+from day8 import (
+    decode_program,
+    dump_instruction,
+    encode_instruction,
+    parse_instruction,
+)
+from day8_bytecode import (
+    HEADER,
+    RECORD,
+    VERSION,
+    check_round_trip,
+    compile_file,
+    load_bytecode,
+    pack_program,
+    unpack_program,
+)
+from utils.parse import parse_to_lines
+from utils.solvers import ROOT
+
+DAY8 = str(ROOT / "data" / "day8.txt")
+EXAMPLE = str(ROOT / "data" / "day8_example.txt")
+
+
+@pytest.mark.parametrize("path", [DAY8, EXAMPLE])
+def test_data_round_trips(path):
+    instructions = parse_to_lines(path)
+    program = decode_program(instructions)
+    check_round_trip(instructions)
+    assert unpack_program(pack_program(program)) == program
+
+
+@pytest.mark.parametrize(
+    "line",
+    ["nop +0", "acc -99", "jmp -0", "jmp +2147483647", "acc -2147483648"],
+)
+def test_operands_round_trip(line):
+    check_round_trip((line,))
+    (restored,) = unpack_program(pack_program(decode_program((line,))))
+    parsed = parse_instruction(line)
+    assert parse_instruction(encode_instruction(restored)) == parsed
+    assert parse_instruction(dump_instruction(parsed)) == parsed
+
+
+@pytest.mark.parametrize("line", ["jmp +2147483648", "acc -2147483649"])
+def test_operand_overflow_raises_value_error(line):
+    with pytest.raises(ValueError, match="can't be stored"):
+        check_round_trip((line,))
+
+
+def test_bad_magic():
+    buffer = b"XXXX" + pack_program(((0, 0),))[4:]
+    with pytest.raises(ValueError, match="magic"):
+        unpack_program(buffer)
+
+
+def test_bad_version():
+    buffer = HEADER.pack(b"AOC8", VERSION + 1, 0)
+    with pytest.raises(ValueError, match="version"):
+        unpack_program(buffer)
+
+
+def test_unknown_opcode():
+    buffer = HEADER.pack(b"AOC8", VERSION, 1) + RECORD.pack(7, 0)
+    with pytest.raises(ValueError, match="opcode"):
+        unpack_program(buffer)
+
+
+@pytest.mark.parametrize("size", [0, 3, HEADER.size - 1])
+def test_truncated_header(size):
+    with pytest.raises(ValueError, match="truncated"):
+        unpack_program(pack_program(((0, 0),))[:size])
+
+
+def test_truncated_records():
+    buffer = pack_program(((0, 0), (1, 5), (2, -1)))
+    with pytest.raises(ValueError, match="truncated"):
+        unpack_program(buffer[:-1])
+
+
+def test_load_bytecode_reads_written_file(tmp_path):
+    target = tmp_path / "day8.bc"
+    program = compile_file(DAY8, str(target))
+    assert load_bytecode(str(target)) == program
+    assert program == decode_program(parse_to_lines(DAY8))
+
+
+def test_compile_file_rejects_overflow_before_writing(tmp_path):
+    source = tmp_path / "big.txt"
+    source.write_text("nop +0\njmp +2147483648")
+    target = tmp_path / "big.bc"
+    with pytest.raises(ValueError):
+        compile_file(str(source), str(target))
+    assert not target.exists()
@@ -0,0 +1,148 @@
+"""On-disk cache of solver answers, keyed by solver and input content.
+
+A key is a sha256 over the solver's (day, part, engine, version) and the
+sha256 of its input text, which is hashed a chunk at a time as it streams in,
+so checking the cache never parses or holds the input. Unless a solver pins
+its version, the version is a digest of its source (see
+`utils.solvers.source_version`), so editing a solver retires its answers.
+Each answer is one small JSON file named by its key. Files are written via a
+temporary file and renamed, so concurrent processes only ever see whole
+entries; reads touch the file's mtime, and once the directory grows past
+`max_bytes` the least recently used entries are removed.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import typing as t
+
+from utils.files import write_atomic
+from utils.parse import CHUNK_SIZE, iter_chunks
+from utils.solvers import ROOT, Solver, solver_version
+
+DEFAULT_DIRECTORY = str(ROOT / ".cache" / "results")
+DEFAULT_MAX_BYTES = 1 << 20
+MISSING = object()
+
+
+def digest_text(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def digest_input(relative_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """`digest_text(parse_file(relative_path))`, without reading it all in."""
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(relative_path, chunk_size):
+        digest.update(chunk.encode())
+    return digest.hexdigest()
+
+
+def result_key(solver: Solver, input_digest: str) -> str:
+    version = solver_version(solver)
+    identity = f"{solver.day}:{solver.part}:{solver.engine}:{version}"
+    return hashlib.sha256(f"{identity}:{input_digest}".encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        directory: str = DEFAULT_DIRECTORY,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, default: t.Any = MISSING) -> t.Any:
+        """The cached answer for `key`, or `default`."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            answer = entry["answer"]
+            os.utime(path)
+        except (FileNotFoundError, ValueError, KeyError):
+            return default
+        return answer
+
+    def put(self, key: str, solver: Solver, answer: t.Any) -> bool:
+        """Store an answer. False if it can't be stored as JSON."""
+        entry = {
+            "day": solver.day,
+            "part": solver.part,
+            "engine": solver.engine,
+            "version": solver_version(solver),
+            "answer": answer,
+        }
+        try:
+            encoded = json.dumps(entry)
+        except (TypeError, ValueError):
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(self._path(key), encoded)
+        self.evict()
+        return True
+
+    def _entries(self) -> t.List[t.Tuple[float, int, t.List[str]]]:
+        """(last use, size, paths) of every entry, least recently used first.
+
+        An entry is every file named `<key>.<suffix>`: one answer here, but
+        the same eviction also bounds multi-file entries like day 6 columns.
+        Temporary files (hidden, mid-write) are left alone.
+        """
+        entries: t.Dict[str, t.List[t.Any]] = {}
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name.startswith("."):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entry = entries.setdefault(name.split(".", 1)[0], [0.0, 0, []])
+            entry[0] = max(entry[0], stat.st_mtime)
+            entry[1] += stat.st_size
+            entry[2].append(path)
+        return sorted(tuple(entry) for entry in entries.values())
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def _remove(paths: t.Iterable[str]):
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def evict(self) -> int:
+        """Drop least recently used entries until under `max_bytes`."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, paths in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(paths)
+            total -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for _, _, paths in entries:
+            self._remove(paths)
+        return len(entries)
@@ -0,0 +1,56 @@
+"""Helpers for the files solvers write about their inputs (caches, indexes).
+
+`write_atomic` writes to a temporary file in the target's directory and
+renames it over the target, so readers in other threads or processes only
+ever see a whole file. Every writer gets its own temporary name, so
+concurrent writers of the same path never share one.
+
+Files derived from an input go under `.cache/sidecars` (see `sidecar_path`)
+rather than beside it, so they never show up as untracked files in `data/`.
+"""
+import contextlib
+import hashlib
+import os
+import tempfile
+import typing as t
+
+from utils.solvers import ROOT
+
+SIDECAR_DIRECTORY = str(ROOT / ".cache" / "sidecars")
+
+
+def write_atomic(path: str, data: t.Union[str, bytes]):
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory or ".", prefix=f".{name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode() if isinstance(data, str) else data)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+
+def file_stamp(path: str) -> t.List[int]:
+    """[size, mtime in ns]; a saved stamp that differs means `path` changed."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def sidecar_path(
+    relative_path: str, suffix: str, directory: str = SIDECAR_DIRECTORY
+) -> str:
+    """Where to keep `suffix` data derived from an input, e.g. an index.
+
+    Named after the input's absolute path, so inputs with the same name in
+    different directories don't share sidecars. Creates `directory`.
+    """
+    absolute = os.path.abspath(relative_path)
+    key = hashlib.sha256(absolute.encode()).hexdigest()[:16]
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(
+        directory, f"{os.path.basename(absolute)}.{key}{suffix}"
+    )
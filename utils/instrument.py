@@ -0,0 +1,222 @@
+"""Opt-in timing and memory instrumentation for parse and solve stages.
+
+Decorate a function with `@instrument()` and it is measured whenever
+instrumentation is enabled:
+
+    with instrumented(memory=True):
+        run_something()
+    write_json("stats.json")
+    write_collapsed("stacks.folded")   # for flamegraph.pl / speedscope
+
+Disabled (the default), a call costs one attribute check on top of the
+function itself. Enabled, every call is counted, and wall time, CPU time and
+tracemalloc peak are taken around the outermost call of each function only,
+so recursion (like `Program.run`'s) is neither double counted nor turned into
+a stack as deep as the recursion. Instrumented calls nested in one another
+make up the collapsed stacks, valued in microseconds of self time. cProfile
+can optionally run underneath for a function-level breakdown.
+"""
+import contextlib
+import cProfile
+import functools
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import typing as t
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class Stats:
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    # Most memory allocated during one call, above what it started with.
+    peak_bytes: int = 0
+
+
+@dataclass
+class _Frame:
+    name: str
+    wall_start: float
+    cpu_start: float
+    memory_start: int = 0
+    memory_peak: int = 0
+    child_seconds: float = 0.0
+
+
+@dataclass
+class _State:
+    enabled: bool = False
+    memory: bool = False
+    profiler: t.Optional[cProfile.Profile] = None
+    stats: t.Dict[str, Stats] = field(
+        default_factory=lambda: defaultdict(Stats)
+    )
+    stacks: t.Dict[t.Tuple[str, ...], float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    local: threading.local = field(default_factory=threading.local)
+
+
+_state = _State()
+
+
+def _frames() -> t.List[_Frame]:
+    frames = getattr(_state.local, "frames", None)
+    if frames is None:
+        frames = _state.local.frames = []
+    return frames
+
+
+def _enter(name: str) -> t.Optional[_Frame]:
+    """Start measuring `name`, unless it is already running on this thread."""
+    frames = _frames()
+    with _state.lock:
+        _state.stats[name].calls += 1
+    if any(frame.name == name for frame in frames):
+        return None
+
+    frame = _Frame(name, time.perf_counter(), time.process_time())
+    if _state.memory and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            frames[-1].memory_peak = max(frames[-1].memory_peak, peak)
+        tracemalloc.reset_peak()
+        frame.memory_start = frame.memory_peak = current
+    if not frames and _state.profiler is not None:
+        _state.profiler.enable()
+    frames.append(frame)
+    return frame
+
+
+def _exit(frame: _Frame):
+    wall = time.perf_counter() - frame.wall_start
+    cpu = time.process_time() - frame.cpu_start
+    frames = _frames()
+    frames.pop()
+    if not frames and _state.profiler is not None:
+        _state.profiler.disable()
+
+    if _state.memory and tracemalloc.is_tracing():
+        frame.memory_peak = max(
+            frame.memory_peak, tracemalloc.get_traced_memory()[1]
+        )
+        if frames:
+            frames[-1].memory_peak = max(
+                frames[-1].memory_peak, frame.memory_peak
+            )
+    if frames:
+        frames[-1].child_seconds += wall
+
+    stack = tuple(f.name for f in frames) + (frame.name,)
+    with _state.lock:
+        stats = _state.stats[frame.name]
+        stats.wall_seconds += wall
+        stats.cpu_seconds += cpu
+        stats.peak_bytes = max(
+            stats.peak_bytes, frame.memory_peak - frame.memory_start
+        )
+        _state.stacks[stack] += wall - frame.child_seconds
+
+
+F = t.TypeVar("F", bound=t.Callable[..., t.Any])
+
+
+def instrument(name: t.Optional[str] = None) -> t.Callable[[F], F]:
+    """Decorator measuring a function while instrumentation is enabled."""
+
+    def _decorate(func: F) -> F:
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def _instrumented(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            frame = _enter(label)
+            if frame is None:
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _exit(frame)
+
+        return t.cast(F, _instrumented)
+
+    return _decorate
+
+
+def enable(memory: bool = False, profile: bool = False):
+    """Start measuring. `memory` traces allocations, which slows them down."""
+    _state.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if profile and _state.profiler is None:
+        _state.profiler = cProfile.Profile()
+    _state.enabled = True
+
+
+def disable():
+    _state.enabled = False
+    if _state.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state.memory = False
+
+
+def reset():
+    with _state.lock:
+        _state.stats.clear()
+        _state.stacks.clear()
+        _state.profiler = None
+
+
+@contextlib.contextmanager
+def instrumented(memory: bool = False, profile: bool = False):
+    enable(memory, profile)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def report() -> t.Dict[str, t.Dict[str, t.Any]]:
+    with _state.lock:
+        return {
+            name: asdict(stats) for name, stats in sorted(_state.stats.items())
+        }
+
+
+def write_json(path: str):
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2)
+
+
+def collapsed_stacks() -> t.List[str]:
+    """Lines of "outer;inner <microseconds>" in flamegraph's folded format."""
+    with _state.lock:
+        stacks = sorted(_state.stacks.items())
+    return [
+        f"{';'.join(stack)} {round(seconds * 1e6)}" for stack, seconds in stacks
+    ]
+
+
+def write_collapsed(path: str):
+    with open(path, "w") as f:
+        f.writelines(f"{line}\n" for line in collapsed_stacks())
+
+
+def profile_stats() -> t.Optional[pstats.Stats]:
+    """cProfile's view of the instrumented calls, if `enable(profile=True)`."""
+    if _state.profiler is None:
+        return None
+    return pstats.Stats(_state.profiler)
+
+
+def write_profile(path: str):
+    """Save cProfile stats (for pstats, snakeviz...) if there are any."""
+    if _state.profiler is not None:
+        _state.profiler.dump_stats(path)
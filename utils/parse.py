@@ -1,11 +1,121 @@
-"""Utilities for parsing challenge data."""
+"""Utilities for parsing challenge data.
 
+Inputs can be plain files, gzip/bz2/xz-compressed files (detected by their
+magic bytes, whatever they're called) or "-" for stdin. `parse_file` reads a
+whole input; `iter_lines` and `iter_records` stream it in large chunks and
+yield exactly what splitting `parse_file`'s result would, without ever holding
+more than a chunk plus one line or record in memory.
+"""
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import sys
 import typing as t
-from pathlib import Path
+
+STDIN = "-"
+CHUNK_SIZE = 1 << 20
+COMPRESSED: t.Dict[bytes, t.Callable[[t.BinaryIO], t.BinaryIO]] = {
+    b"\x1f\x8b": lambda raw: gzip.GzipFile(fileobj=raw, mode="rb"),
+    b"BZh": bz2.BZ2File,
+    b"\xfd7zXZ\x00": lzma.LZMAFile,
+}
+MAGIC_SIZE = max(len(magic) for magic in COMPRESSED)
+
+
+def detect_format(head: bytes) -> t.Optional[bytes]:
+    """The magic bytes `head` starts with, or None for an uncompressed input."""
+    for magic in COMPRESSED:
+        if head.startswith(magic):
+            return magic
+    return None
+
+
+class _Prepended(io.RawIOBase):
+    """`head` followed by the rest of `raw`, to put back sniffed bytes."""
+
+    def __init__(self, head: bytes, raw: io.RawIOBase):
+        super().__init__()
+        self._head = head
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._head:
+            return self._raw.readinto(buffer)
+        size = min(len(buffer), len(self._head))
+        buffer[:size] = self._head[:size]
+        self._head = self._head[size:]
+        return size
+
+
+def _read_head(raw: io.RawIOBase, size: int) -> bytes:
+    """Up to `size` bytes; a pipe may hand them over a few at a time."""
+    head = b""
+    while len(head) < size:
+        piece = raw.read(size - len(head))
+        if not piece:
+            break
+        head += piece
+    return head
+
+
+@contextlib.contextmanager
+def open_source(
+    relative_path: str, chunk_size: int = CHUNK_SIZE
+) -> t.Iterator[t.BinaryIO]:
+    """A binary stream of an input's (decompressed) contents."""
+    if relative_path == STDIN:
+        raw = open(sys.stdin.fileno(), "rb", buffering=0, closefd=False)
+    else:
+        raw = open(relative_path, "rb", buffering=0)
+    with raw:
+        head = _read_head(raw, MAGIC_SIZE)
+        source = io.BufferedReader(_Prepended(head, raw), chunk_size)
+        with source:
+            magic = detect_format(head)
+            if magic is None:
+                yield source
+            else:
+                with COMPRESSED[magic](source) as stream:
+                    yield stream
+
+
+@contextlib.contextmanager
+def open_text(
+    relative_path: str, chunk_size: int = CHUNK_SIZE
+) -> t.Iterator[t.TextIO]:
+    """As `open_source`, decoded with universal newlines like `read_text`."""
+    with open_source(relative_path, chunk_size) as stream:
+        with io.TextIOWrapper(stream) as text:
+            yield text
+
+
+def iter_chunks(
+    relative_path: str, chunk_size: int = CHUNK_SIZE
+) -> t.Iterator[str]:
+    with open_text(relative_path, chunk_size) as text:
+        yield from iter(lambda: text.read(chunk_size), "")
+
+
+def iter_split(
+    relative_path: str, separator: str, chunk_size: int = CHUNK_SIZE
+) -> t.Iterator[str]:
+    """Stream the pieces of `parse_file(relative_path).split(separator)`."""
+    pending = ""
+    for chunk in iter_chunks(relative_path, chunk_size):
+        pieces = (pending + chunk).split(separator)
+        pending = pieces.pop()
+        yield from pieces
+    yield pending
 
 
 def parse_file(relative_path: str) -> str:
-    return Path(relative_path).read_text()
+    with open_text(relative_path) as text:
+        return text.read()
 
 
 def get_lines(data: str) -> t.Tuple[str, ...]:
@@ -15,3 +125,13 @@ def get_lines(data: str) -> t.Tuple[str, ...]:
 
 def parse_to_lines(relative_path: str) -> t.Tuple[str, ...]:
     return get_lines(parse_file(relative_path))
+
+
+def iter_lines(relative_path: str) -> t.Iterator[str]:
+    """Streaming `parse_to_lines`."""
+    return iter_split(relative_path, "\n")
+
+
+def iter_records(relative_path: str) -> t.Iterator[str]:
+    """Stream the blank-line separated records (groups, passports...)."""
+    return iter_split(relative_path, "\n\n")
@@ -0,0 +1,138 @@
+"""Registry of solvers, so every day can be run and timed the same way.
+
+Days register a solve function for each (part, engine) along with the parser
+that turns input text into what the solver expects:
+
+    @register(day=6, part=2, parse=parse_groups, default_input="data/day6.txt")
+    def count_group_questions(groups): ...
+"""
+
+import functools
+import hashlib
+import importlib
+import sys
+import time
+import types
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+REFERENCE = "reference"
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class Solver:
+    day: int
+    part: int
+    engine: str
+    parse: t.Callable[[str], t.Any]
+    solve: t.Callable[[t.Any], t.Any]
+    default_input: t.Optional[str] = None
+    # Identifies the code in cache keys; None means `source_version`'s digest.
+    version: t.Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Timing:
+    answer: t.Any
+    parse_seconds: float
+    solve_seconds: float
+
+
+SOLVERS: t.Dict[t.Tuple[int, int, str], Solver] = {}
+
+
+def register(
+    day: int,
+    part: int,
+    parse: t.Callable[[str], t.Any],
+    engine: str = REFERENCE,
+    default_input: t.Optional[str] = None,
+    version: t.Optional[str] = None,
+):
+    """Decorator recording a solve function; returns it unchanged."""
+
+    def _register(solve):
+        key = (day, part, engine)
+        if key in SOLVERS:
+            raise ValueError(f"solver already registered for {key}")
+        SOLVERS[key] = Solver(
+            day, part, engine, parse, solve, default_input, version
+        )
+        return solve
+
+    return _register
+
+
+def _repo_file(name: t.Optional[str]) -> t.Optional[Path]:
+    """Source of the module called `name`, if it is one of the repo's."""
+    path = getattr(sys.modules.get(name or ""), "__file__", None)
+    if path is None or ROOT not in Path(path).resolve().parents:
+        return None
+    return Path(path)
+
+
+def source_version(*functions: t.Callable) -> str:
+    """sha256 over the source of the repo modules `functions` are defined in,
+    and of every repo module those use, transitively.
+
+    Any edit to code a solver could run changes it, so cached answers from
+    before the edit are never reused.
+    """
+    pending = [getattr(f, "__module__", None) for f in functions]
+    files: t.Dict[str, Path] = {}
+    while pending:
+        name = pending.pop()
+        path = _repo_file(name)
+        if name is None or path is None or name in files:
+            continue
+        files[name] = path
+        for value in list(vars(sys.modules[name]).values()):
+            if isinstance(value, types.ModuleType):
+                pending.append(value.__name__)
+            else:
+                pending.append(getattr(value, "__module__", None))
+
+    digest = hashlib.sha256()
+    for name, path in sorted(files.items()):
+        digest.update(name.encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def solver_version(solver: Solver) -> str:
+    """`solver.version` if pinned, else a digest of the code behind it."""
+    return solver.version or source_version(solver.parse, solver.solve)
+
+
+def discover() -> t.Dict[t.Tuple[int, int, str], Solver]:
+    """Import every day module in the repo root so they can register."""
+    for path in sorted(ROOT.glob("day*.py")):
+        importlib.import_module(path.stem)
+    return SOLVERS
+
+
+def get_solver(day: int, part: int, engine: str = REFERENCE) -> Solver:
+    try:
+        return SOLVERS[(day, part, engine)]
+    except KeyError:
+        known = sorted(e for d, p, e in SOLVERS if (d, p) == (day, part))
+        raise ValueError(
+            f"no {engine!r} solver for day {day} part {part}; known: {known}"
+        ) from None
+
+
+def solvers_for(day: int) -> t.Tuple[Solver, ...]:
+    return tuple(s for key, s in sorted(SOLVERS.items()) if key[0] == day)
+
+
+def time_solver(solver: Solver, data: str) -> Timing:
+    """Parse then solve `data`, timing each stage separately."""
+    started = time.perf_counter()
+    parsed = solver.parse(data)
+    parsed_at = time.perf_counter()
+    answer = solver.solve(parsed)
+    solved_at = time.perf_counter()
+    return Timing(answer, parsed_at - started, solved_at - parsed_at)
@@ -0,0 +1,171 @@
+"""Scalable synthetic inputs, in the same text formats as the files in data/.
+
+Every generator takes a `random.Random` so that runs are reproducible.
+"""
+import random
+import string
+import typing as t
+
+ADJECTIVES = (
+    "bright clear dark dim dotted drab dull faded light mirrored muted pale "
+    "plaid posh shiny striped vibrant wavy"
+).split()
+COLOURS = (
+    "aqua beige black blue bronze brown chartreuse coral crimson cyan fuchsia "
+    "gold gray green indigo lavender lime magenta maroon olive orange plum "
+    "purple red salmon silver tan teal tomato turquoise violet white yellow"
+).split()
+
+
+# ***** day 5 *****
+
+
+def seat_hash(seat_id: int) -> str:
+    """The boarding pass for a seat ID, e.g. 357 -> 'FBFBBFFRLR'."""
+    bits = format(seat_id, "010b")
+    row = bits[:7].replace("0", "F").replace("1", "B")
+    col = bits[7:].replace("0", "L").replace("1", "R")
+    return row + col
+
+
+def boarding_passes(
+    rng: random.Random, rows: int = 128, cols: int = 8
+) -> t.Tuple[str, ...]:
+    """Passes for one full flight: a contiguous block of seats with one gap.
+
+    The missing seat is never at either end of the block, as in the puzzle.
+    """
+    seats = rows * cols
+    first = rng.randrange(1, seats // 4)
+    last = rng.randrange(seats * 3 // 4, seats - 1)
+    mine = rng.randrange(first + 1, last)
+    passes = [seat_hash(i) for i in range(first, last + 1) if i != mine]
+    rng.shuffle(passes)
+    return tuple(passes)
+
+
+def fleet(rng: random.Random, flights: int) -> t.Tuple[t.Tuple[str, ...], ...]:
+    return tuple(boarding_passes(rng) for _ in range(flights))
+
+
+# ***** day 6 *****
+
+
+def customs_groups(
+    rng: random.Random,
+    groups: int,
+    max_people: int = 5,
+    distinct: t.Optional[int] = None,
+) -> str:
+    """`groups` blank-line separated groups of per-person answer lines.
+
+    With `distinct`, every person's answers come from a pool of that many
+    answer strings, like real surveys where the same answers recur.
+    """
+    letters = string.ascii_lowercase
+
+    def _answers():
+        return "".join(rng.sample(letters, rng.randint(1, len(letters))))
+
+    if distinct is None:
+        _person = _answers
+    else:
+        pool = [_answers() for _ in range(distinct)]
+
+        def _person():
+            return rng.choice(pool)
+
+    return "\n\n".join(
+        "\n".join(_person() for _ in range(rng.randint(1, max_people)))
+        for _ in range(groups)
+    )
+
+
+# ***** day 7 *****
+
+
+def colour_name(index: int) -> str:
+    """A unique colour for every index; the first few hundred are two words."""
+    adjective = ADJECTIVES[index % len(ADJECTIVES)]
+    rest = index // len(ADJECTIVES)
+    colour = COLOURS[rest % len(COLOURS)]
+    rest //= len(COLOURS)
+    if rest == 0:
+        return f"{adjective} {colour}"
+
+    suffix = ""
+    while rest:
+        rest, letter = divmod(rest, 26)
+        suffix += string.ascii_lowercase[letter]
+    return f"{adjective} {colour} {suffix}"
+
+
+def _format_rule(container: str, contents: t.Dict[str, int]) -> str:
+    if not contents:
+        return f"{container} bags contain no other bags."
+    items = ", ".join(
+        f"{count} {colour} {'bag' if count == 1 else 'bags'}"
+        for colour, count in contents.items()
+    )
+    return f"{container} bags contain {items}."
+
+
+def bag_rules(
+    rng: random.Random, colours: int, depth: int = 6, fan_out: int = 3
+) -> str:
+    """A random DAG of bag rules, `depth` layers deep.
+
+    Bags only contain bags from the next layer down, 1 to `fan_out` kinds of
+    them; the bottom layer holds no other bags. "shiny gold" sits in the middle
+    layer so both day 7 questions have non-trivial answers.
+    """
+    names = [colour_name(i) for i in range(colours)]
+    if "shiny gold" in names:
+        names.remove("shiny gold")
+    else:
+        names.pop()
+    layers = [names[i::depth] for i in range(depth)]
+    layers[depth // 2][0:0] = ["shiny gold"]
+
+    lines = []
+    for d, layer in enumerate(layers):
+        deeper = layers[d + 1] if d + 1 < depth else []
+        for name in layer:
+            picks = rng.sample(
+                deeper, min(len(deeper), rng.randint(1, fan_out))
+            )
+            lines.append(
+                _format_rule(name, {p: rng.randint(1, 9) for p in picks})
+            )
+
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+# ***** day 8 *****
+
+
+def boot_program(rng: random.Random, size: int, faults: int = 1) -> str:
+    """A program with planted faults: `jmp`s that should have been `nop`s.
+
+    Every other jump goes forwards and no jump (flipped nops included) can skip
+    a fault, so execution reaches each fault in turn, loops back, and only
+    terminates once all of them are flipped.
+    """
+    planted = sorted(rng.sample(range(size // 2, size), faults))
+    lines = []
+    for i in range(size):
+        if i in planted:
+            lines.append(f"jmp -{rng.randint(1, min(i, 20))}")
+            continue
+
+        ahead = [fault for fault in planted if fault > i]
+        limit = (ahead[0] if ahead else size) - i
+        roll = rng.random()
+        if roll < 0.5:
+            lines.append(f"acc {rng.randint(-50, 50):+d}")
+        elif roll < 0.8 or i == size - 1:
+            lines.append(f"nop +{rng.randint(0, min(limit, 20))}")
+        else:
+            lines.append(f"jmp +{rng.randint(1, max(1, min(limit, 5)))}")
+    return "\n".join(lines)